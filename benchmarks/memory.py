@@ -0,0 +1,82 @@
+"""
+Measures the memory retained per mapped record using :mod:`tracemalloc`, along with the reduction over value slots
+represented as they were before values were slotted and shared.
+
+Run from the repository root::
+
+    python benchmarks/memory.py [--records N]
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+
+## Make sure that we benchmark the working copy:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from normalazy import Field, KeyField, Record, as_date, as_factor, as_number  # noqa: E402
+
+
+class UnslottedValue(object):
+    """
+    Defines a value slot as represented before values were slotted and shared, ie. with an instance dictionary
+    and a payload dictionary each.
+    """
+
+    def __init__(self, value=None, message=None, status=None, **kwargs):
+        self.__value = value
+        self.__status = status
+        self.__message = message
+        self.__payload = kwargs
+
+
+class BenchRecord(Record):
+    """
+    Defines a typical record with casts, blank and missing values.
+    """
+    __slots__ = ()
+
+    id = KeyField(cast=as_number)
+    code = KeyField(cast=as_factor)
+    date = KeyField(cast=as_date)
+    note = KeyField()
+    comment = KeyField()
+    total = Field(func=lambda instance, record: instance.id)
+
+
+def rows(count):
+    """
+    Generates synthetic raw records.
+    """
+    for index in range(count):
+        yield {"id": str(index), "code": "c{}".format(index % 7), "date": "2015-01-01", "note": ""}
+
+
+def measure(count, unslotted=False):
+    """
+    Maps the records, keeps them in memory and returns the number of bytes retained per record.
+
+    If ``unslotted`` is ``True``, the value slots of records are replaced with :class:`UnslottedValue` instances.
+    """
+    raws = list(rows(count))
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    records = list(BenchRecord.map_many(raws))
+    if unslotted:
+        for record in records:
+            record._values[:] = [UnslottedValue(value.value, value.message, value.status) for value in record._values]
+    retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, "filename"))
+    tracemalloc.stop()
+    assert len(records) == count
+    return retained / float(count)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000, help="Number of records to map.")
+    args = parser.parse_args()
+    before, after = measure(args.records, unslotted=True), measure(args.records)
+    print("bytes/record (unslotted values): {:.1f}".format(before))
+    print("bytes/record: {:.1f}".format(after))
+    print("reduction: {:.1f} bytes/record ({:.1%})".format(before - after, (before - after) / before))
@@ -0,0 +1,240 @@
+"""
+Measures records/sec and bytes/record for the mapping paths over synthetic data.
+
+Every case is run for narrow and wide schemas and for small and large batches. Results are printed as a table and
+written as JSON, which can be compared with the results of another commit to catch regressions.
+
+Run from the repository root::
+
+    python benchmarks/suite.py [--output results.json] [--compare baseline.json] [--filter as_date] [--scale 0.1]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from collections import OrderedDict
+
+## Make sure that we benchmark the working copy:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import normalazy  # noqa: E402
+from normalazy import (ChoiceKeyField, Field, KeyField, Record, as_boolean, as_date, as_datetime,  # noqa: E402
+                       as_factor, as_number, as_string)
+
+#: Defines the number of fields by schema.
+SCHEMAS = OrderedDict([("narrow", 5), ("wide", 100)])
+
+#: Defines the number of records by batch.
+BATCHES = OrderedDict([("small", 100), ("large", 10000)])
+
+#: Defines the choices of choice key fields.
+CHOICES = {"a": 1, "b": 2, "c": 3}
+
+
+def _key(index):
+    """
+    Returns the key of the raw value for the field at the index.
+    """
+    return "f{:03d}".format(index)
+
+
+def _callable(instance, record):
+    """
+    Defines the function of fields with callable functions.
+    """
+    return record.get("f000")
+
+
+## Generators of synthetic raw values by kind, accepting a random number generator:
+VALUES = {
+    "string": lambda rng: " value {} ".format(rng.randint(0, 999)),
+    "factor": lambda rng: rng.choice(["alpha", "beta", "gamma", " delta "]),
+    "number": lambda rng: "{:.2f}".format(rng.uniform(-1000, 1000)),
+    "boolean": lambda rng: rng.choice(["", "1", "yes"]),
+    "date": lambda rng: (datetime.date(2015, 1, 1) + datetime.timedelta(days=rng.randint(0, 3650))).isoformat(),
+    "datetime": lambda rng: (datetime.datetime(2015, 1, 1) + datetime.timedelta(seconds=rng.randint(0, 10 ** 8)))
+    .isoformat(" "),
+    "choice": lambda rng: rng.choice(sorted(CHOICES)),
+}
+
+
+## Definitions of mapping cases as the kind of raw values and the field factory:
+MAPPINGS = OrderedDict([
+    ("KeyField", ("string", lambda key: KeyField(key=key))),
+    ("ChoiceKeyField", ("choice", lambda key: ChoiceKeyField(key=key, choices=CHOICES))),
+    ("Field(callable)", ("string", lambda key: Field(func=_callable))),
+    ("Field(method)", ("string", lambda key: Field(func="compute"))),
+    ("as_string", ("string", lambda key: KeyField(key=key, cast=as_string))),
+    ("as_factor", ("factor", lambda key: KeyField(key=key, cast=as_factor))),
+    ("as_number", ("number", lambda key: KeyField(key=key, cast=as_number))),
+    ("as_boolean", ("boolean", lambda key: KeyField(key=key, cast=as_boolean))),
+    ("as_date", ("date", lambda key: KeyField(key=key, cast=as_date))),
+    ("as_datetime", ("datetime", lambda key: KeyField(key=key, cast=as_datetime))),
+])
+
+#: Defines the kinds of raw values of the mixed schema used for export cases.
+MIXED = ["string", "factor", "number", "boolean", "date"]
+
+
+def schema(name, factories):
+    """
+    Creates a record class with the fields created by the factories for their keys.
+    """
+    attrs = dict((_key(index), factory(_key(index))) for index, factory in enumerate(factories))
+    attrs["compute"] = lambda self, record: record.get("f000")
+    attrs["__slots__"] = ()
+    return type(name, (Record,), attrs)
+
+
+def rows(kinds, count, seed=42):
+    """
+    Generates synthetic raw records with the kinds of raw values in order.
+    """
+    rng = random.Random(seed)
+    return [dict((_key(index), VALUES[kind](rng)) for index, kind in enumerate(kinds)) for _ in range(count)]
+
+
+def mapping(kind, factory, width, count):
+    """
+    Returns a function mapping synthetic raw records with fields of a kind, returning the records.
+    """
+    record_cls = schema("Bench", [factory] * width)
+    raws = rows([kind] * width, count)
+    return lambda: list(record_cls.map_many(raws))
+
+
+def export(name, width, count):
+    """
+    Returns a function exporting records of the mixed schema mapped beforehand, returning the results.
+    """
+    kinds = [MIXED[index % len(MIXED)] for index in range(width)]
+    record_cls = schema("Bench", [MAPPINGS["as_" + kind][1] for kind in kinds])
+    records = list(record_cls.map_many(rows(kinds, count)))
+    if name == "as_dict":
+        return lambda: [record.as_dict() for record in records]
+    elif name == "as_dict(detailed)":
+        return lambda: [record.as_dict(detailed=True) for record in records]
+    return lambda: [record_cls.new(record, f000="override") for record in records]
+
+
+def cases(width, count):
+    """
+    Generates the names of the cases and functions setting them up, which return functions running the cases once.
+    """
+    for name, (kind, factory) in MAPPINGS.items():
+        yield name, (lambda kind=kind, factory=factory: mapping(kind, factory, width, count))
+    for name in ("as_dict", "as_dict(detailed)", "Record.new"):
+        yield name, (lambda name=name: export(name, width, count))
+
+
+def measure(func, count, repeat):
+    """
+    Returns the records/sec of the best run and the bytes retained per record by the results of a run.
+    """
+    ## Time first:
+    best = min(timeit.repeat(func, number=1, repeat=repeat))
+
+    ## Now, measure the memory retained by the results:
+    tracemalloc.start()
+    snapshot = tracemalloc.take_snapshot()
+    results = func()
+    retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(snapshot, "filename"))
+    tracemalloc.stop()
+    assert len(results) == count
+
+    ## Done, return:
+    return count / best, retained / float(count)
+
+
+def commit():
+    """
+    Returns the commit of the working copy, if any.
+    """
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__),
+                                       stderr=subprocess.STDOUT).decode("ascii").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale=1.0, repeat=3, pattern=None):
+    """
+    Runs the cases and returns the results.
+    """
+    results = []
+    for schema_name, width in SCHEMAS.items():
+        for batch_name, size in BATCHES.items():
+            count = max(1, int(size * scale))
+            for name, setup in cases(width, count):
+                if pattern and pattern not in name:
+                    continue
+                rate, size_per_record = measure(setup(), count, repeat)
+                results.append(OrderedDict([("case", name), ("schema", schema_name), ("batch", batch_name),
+                                            ("fields", width), ("records", count),
+                                            ("records_per_sec", round(rate, 1)),
+                                            ("bytes_per_record", round(size_per_record, 1))]))
+                print("{case:<20} {schema:<7} {batch:<6} {records_per_sec:>12.1f} rec/s {bytes_per_record:>10.1f} "
+                      "B/rec".format(**results[-1]))
+    return OrderedDict([("meta", OrderedDict([("normalazy", normalazy.__version__),
+                                              ("commit", commit()),
+                                              ("python", platform.python_version()),
+                                              ("platform", platform.platform()),
+                                              ("timestamp", datetime.datetime.utcnow().isoformat()),
+                                              ("scale", scale),
+                                              ("repeat", repeat)])),
+                        ("results", results)])
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints the relative change of records/sec with respect to the baseline and returns the regressions.
+    """
+    ## Index the baseline results:
+    base = dict(((r["case"], r["schema"], r["batch"]), r) for r in baseline["results"])
+
+    ## Compare:
+    regressions = []
+    for result in results["results"]:
+        previous = base.get((result["case"], result["schema"], result["batch"]))
+        if previous is None:
+            continue
+        change = result["records_per_sec"] / previous["records_per_sec"] - 1
+        flag = "REGRESSION" if change < -threshold else ""
+        if flag:
+            regressions.append(result)
+        print("{:<20} {:<7} {:<6} {:>+8.1%} {}".format(result["case"], result["schema"], result["batch"], change, flag))
+
+    ## Done, return regressions:
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="File to write the JSON results to.")
+    parser.add_argument("--compare", help="File with JSON results to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slow-down counted as a regression.")
+    parser.add_argument("--filter", help="Run only the cases with names containing this string.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Factor to scale the batch sizes with.")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of timed runs per case, the best is kept.")
+    args = parser.parse_args()
+
+    ## Run the suite:
+    output = run(args.scale, args.repeat, args.filter)
+
+    ## Write the results, if required:
+    if args.output:
+        with open(args.output, "w") as ofile:
+            json.dump(output, ofile, indent=2)
+
+    ## Compare with the baseline, if required:
+    if args.compare:
+        with open(args.compare) as ifile:
+            if compare(output, json.load(ifile), args.threshold):
+                sys.exit(1)
@@ -1,14 +1,245 @@
+import array
+import collections
+import contextlib
 import copy
+import csv
+import binascii
 import datetime
+import hashlib
+import inspect
+import io
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
+import operator
+import pickle
+import random
+import re
+import time
+import types
 from collections import OrderedDict
-from decimal import Decimal
-from functools import wraps
+from decimal import ROUND_HALF_EVEN, Decimal
+from functools import partial, wraps
 
-from six import add_metaclass
+from six import add_metaclass, get_unbound_function
 
 #: Defines the version of the `normalazy` library.
 __version__ = "0.0.3"
 
+#: Defines a sentinel for missing values.
+_MISSING = object()
+
+#: Defines the shared empty set of value slot indices, as empty frozensets are not shared on every Python version.
+_NO_INDICES = frozenset()
+
+#: Defines the shared empty mapping of resolved values for lookups without prefetched values.
+_NO_LOOKUPS = {}
+
+#: Defines the clock for profiling.
+_clock = getattr(time, "perf_counter", time.time)
+
+#: Defines the test for asynchronous functions (always negative on Python 2).
+_iscoroutinefunction = getattr(inspect, "iscoroutinefunction", lambda func: False)
+
+
+def _map_chunk(record_cls, chunk, output, header=None, fields=None):
+    """
+    Maps a chunk of raw records in a worker process.
+
+    :param record_cls: The record class.
+    :param chunk: The list of raw records.
+    :param output: ``"values"`` for tuples of value slots, ``"tuple"`` for tuples of values.
+    :param header: The header if raw records are positional rows.
+    :param fields: The names of the fields to be computed, all if ``None``.
+    :return: The list of results.
+    """
+    evaluate = record_cls._evaluate
+    indices = None if fields is None else record_cls._projection(fields)
+    mappers = None if header is None else record_cls._header_mappers(header)
+    fingerprint = record_cls._fingerprinter(header)
+    with record_cls._prefetched(chunk, header) as lookups:
+        if output == "values":
+            return [tuple(evaluate(raw, mappers, indices, fingerprint, lookups)._values) for raw in chunk]
+        return [evaluate(raw, mappers, indices, fingerprint, lookups).as_tuple(fields) for raw in chunk]
+
+
+def _resolve_header(records, header):
+    """
+    Returns the raw records and the header, taking the header from the first raw record if ``header`` is ``True``.
+
+    :param records: An iterable of raw records.
+    :param header: The header, ``True`` or ``None``.
+    :return: A tuple of the iterable of the (remaining) raw records and the header.
+
+    >>> records, header = _resolve_header([("a", "b"), (1, 2)], True)
+    >>> (list(records), header)
+    ([(1, 2)], ('a', 'b'))
+    """
+    if header is True:
+        records = iter(records)
+        header = next(records, None)
+    return records, header
+
+
+def _header_positions(header):
+    """
+    Returns the column indices by keys, the first column winning for duplicate keys.
+
+    :param header: The sequence of keys in column order.
+    :return: A dictionary of keys and column indices.
+
+    >>> sorted(_header_positions(["a", "b", "a"]).items())
+    [('a', 0), ('b', 1)]
+    """
+    positions = {}
+    for position, key in enumerate(header):
+        positions.setdefault(key, position)
+    return positions
+
+
+def _chunks(iterable, size):
+    """
+    Splits the iterable into lists of at most ``size`` elements lazily.
+
+    :param iterable: The iterable to be split.
+    :param size: The maximum number of elements in each chunk.
+    :return: A generator of lists.
+
+    >>> list(_chunks(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _guard(core, guards, extra=True):
+    """
+    Returns a function which returns the first argument as is if it is ``None`` and ``"null"`` is in the guards, or
+    if it is blank and ``"blank"`` is in the guards, and invokes the core function otherwise.
+
+    :param core: The core function.
+    :param guards: The set of guards.
+    :param extra: Indicates if the function shall pass additional arguments to the core function.
+    :return: The guarding function.
+    """
+    null, blank = "null" in guards, "blank" in guards
+    if extra:
+        if null and blank:
+            def guarded(value, *args, **kwargs):
+                return value if value is None or value == "" else core(value, *args, **kwargs)
+        elif null:
+            def guarded(value, *args, **kwargs):
+                return None if value is None else core(value, *args, **kwargs)
+        elif blank:
+            def guarded(value, *args, **kwargs):
+                return value if value == "" else core(value, *args, **kwargs)
+        else:
+            def guarded(value, *args, **kwargs):
+                return core(value, *args, **kwargs)
+    else:
+        if null and blank:
+            guarded = lambda value: value if value is None or value == "" else core(value)
+        elif null:
+            guarded = lambda value: None if value is None else core(value)
+        elif blank:
+            guarded = lambda value: value if value == "" else core(value)
+        else:
+            guarded = lambda value: core(value)
+    return guarded
+
+
+def _vectorized(cast):
+    """
+    Returns the vectorized version of the cast, if any.
+
+    Decorators built with :func:`functools.wraps` copy the ``vectorized`` attribute of the cast they decorate, but
+    the vectorized version would skip the decorator. Hence the attribute is trusted only if it is set on the cast
+    itself, or if the cast is a wrapper built by this module which does not change the results.
+
+    :param cast: The cast.
+    :return: The vectorized version of the cast, ``None`` if it has none.
+
+    >>> def rounded(cast):
+    ...     @wraps(cast)
+    ...     def wrapper(value):
+    ...         return round(cast(value), 1)
+    ...     return wrapper
+    >>> (_vectorized(rounded(as_float)), _vectorized(iffnotnull(as_float)) is as_float.vectorized)
+    (None, True)
+    """
+    vectorized = getattr(cast, "vectorized", None)
+    wrapped = getattr(cast, "__wrapped__", None)
+    if vectorized is None or wrapped is None or getattr(wrapped, "vectorized", None) is not vectorized:
+        return vectorized
+    return _vectorized(wrapped) if getattr(cast, "_fused", None) is cast else None
+
+
+def _fuse(wrapper, guards, core):
+    """
+    Exposes the guards and the unguarded function of a wrapper built by this module, marking the wrapper as their
+    owner.
+
+    :param wrapper: The guarding wrapper.
+    :param guards: The set of guards.
+    :param core: The unguarded function.
+    :return: The wrapper.
+    """
+    wrapper.guards, wrapper.unguarded, wrapper._fused = guards, core, wrapper
+    return wrapper
+
+
+def _fusion(func):
+    """
+    Returns the guards and the unguarded function of a wrapper built by this module, or no guards and the function
+    itself for any other callable.
+
+    Decorators built with :func:`functools.wraps` copy the ``guards`` and ``unguarded`` attributes of the guarded
+    function they decorate, but calling the unguarded function would skip the decorator. Hence the attributes are
+    trusted only if the wrapper is marked as their owner.
+
+    :param func: The function.
+    :return: A tuple of the set of guards and the unguarded function.
+
+    >>> def rounded(cast):
+    ...     @wraps(cast)
+    ...     def wrapper(value):
+    ...         return round(cast(value), 1)
+    ...     return wrapper
+    >>> cast = rounded(as_float)
+    >>> _fusion(cast) == (frozenset(), cast)
+    True
+    >>> [func("1.2345") for func in (cast, iffnotnull(cast), cached(cast), chain(as_string, cast))]
+    [1.2, 1.2, 1.2, 1.2]
+    >>> KeyField(key="a", cast=cast).compile()(None, dict(a="1.2345")).value
+    1.2
+    """
+    if getattr(func, "_fused", None) is func:
+        return frozenset(func.guards), func.unguarded
+    return frozenset(), func
+
+
+def _guarded(func, guards):
+    """
+    Wraps a function with the guards, fusing them with the guards the function applies already, if any, into a
+    single wrapper around the unguarded function.
+
+    The wrapper exposes the set of guards as ``guards`` attribute and the unguarded function as ``unguarded``
+    attribute.
+
+    :param func: The function to be wrapped.
+    :param guards: The guards to be added.
+    :return: The wrapper.
+    """
+    fused, core = _fusion(func)
+    guards = fused | frozenset(guards)
+    return _fuse(wraps(func)(_guard(core, guards)), guards, core)
+
 
 def iffnotnull(func):
     """
@@ -21,11 +252,16 @@ def iffnotnull(func):
     >>> test1(None)
     >>> test1(1)
     1
+
+    Stacked guards are fused into a single wrapper:
+
+    >>> test2 = iffnotnull(iffnotblank(lambda x: x + 1))
+    >>> (test2(None), test2(""), test2(1))
+    (None, '', 2)
+    >>> sorted(test2.guards)
+    ['blank', 'null']
     """
-    @wraps(func)
-    def wrapper(value, *args, **kwargs):
-        return None if value is None else func(value, *args, **kwargs)
-    return wrapper
+    return _guarded(func, ["null"])
 
 
 def iffnotblank(func):
@@ -41,10 +277,56 @@ def iffnotblank(func):
     >>> test1(1)
     1
     """
-    @wraps(func)
-    def wrapper(value, *args, **kwargs):
-        return value if value == "" else func(value, *args, **kwargs)
-    return wrapper
+    return _guarded(func, ["blank"])
+
+
+def chain(*casts):
+    """
+    Fuses the casts into a single cast applying them in order, ie. ``chain(f, g)(x) == g(f(x))``.
+
+    The guards of the casts (see :func:`iffnotnull` and :func:`iffnotblank`) are checked in a flat loop around the
+    unguarded functions instead of calling through the wrappers. The guards which apply to the chain as a whole, ie.
+    the ones applied by all casts, are checked once upfront and exposed as ``guards`` attribute along with the
+    ``unguarded`` function, so that :class:`KeyField` can skip them.
+
+    :param casts: The casts to be fused, each accepting a single argument.
+    :return: The fused cast.
+
+    >>> cast = chain(as_string, as_factor)
+    >>> [cast(value) for value in (None, "", " a ")]
+    [None, '', 'A']
+    >>> sorted(cast.guards)
+    ['null']
+    >>> cast = chain(as_string, as_number)
+    >>> [cast(value) for value in (None, " ", " 1 ")]
+    [None, '', Decimal('1')]
+    >>> chain(as_string, as_boolean)(None)
+    False
+    """
+    ## Check the casts:
+    if not casts:
+        raise ValueError("At least one cast is required.")
+
+    ## Get the guards and the unguarded functions of the casts, and the guards of the chain:
+    segments = [_fusion(cast) for cast in casts]
+    guards = frozenset.intersection(*[segment[0] for segment in segments])
+
+    ## The guards of the chain are checked upfront, the rest are checked as we go:
+    steps = tuple([("null" in checks, "blank" in checks, core) for checks, core in
+                   [(segments[0][0] - guards, segments[0][1])] + segments[1:]])
+
+    ## Get the unguarded function of the chain:
+    if len(steps) == 1 and not steps[0][0] and not steps[0][1]:
+        core = steps[0][2]
+    else:
+        def core(value):
+            for null, blank, step in steps:
+                if not (null and value is None) and not (blank and value == ""):
+                    value = step(value)
+            return value
+
+    ## Guard the chain, expose the guards and the unguarded function, and return:
+    return _fuse(_guard(core, guards, extra=False), guards, core)
 
 
 def identity(x):
@@ -96,7 +378,7 @@ def as_factor(x):
     >>> as_factor(" a ")
     'A'
     """
-    return as_string(x).upper()
+    return str(x).strip().upper()
 
 
 @iffnotnull
@@ -115,8 +397,148 @@ def as_number(x):
     Decimal('1')
     >>> as_number(" 1 ")
     Decimal('1')
+    >>> as_number(Decimal("1.50"))
+    Decimal('1.50')
+    """
+    ## Decimals are returned and integers are converted as they are:
+    if type(x) is Decimal:
+        return x
+    elif type(x) is int:
+        return Decimal(x)
+    return Decimal(str(x).strip())
+
+
+@iffnotnull
+@iffnotblank
+def as_float(x):
+    """
+    Converts the value to a floating point number, returning floats as they are. Use when ``Decimal`` precision is
+    not required.
+
+    :param x: The value to be converted to a floating point number.
+    :return: A float.
+
+    >>> as_float(None)
+    >>> as_float("")
+    ''
+    >>> as_float(" 1.5 ")
+    1.5
+    >>> as_float(2)
+    2.0
+    >>> as_float(Decimal("0.25"))
+    0.25
+    """
+    return x if type(x) is float else float(x)
+
+
+@iffnotnull
+@iffnotblank
+def as_integer(x):
+    """
+    Converts the value to an integer, returning integers as they are. Numbers with fractional parts are rejected.
+
+    :param x: The value to be converted to an integer.
+    :return: An int.
+
+    >>> as_integer(None)
+    >>> as_integer("")
+    ''
+    >>> as_integer(" 12 ")
+    12
+    >>> as_integer("12.0")
+    12
+    >>> as_integer(3.0)
+    3
+    >>> as_integer("12.5")
+    Traceback (most recent call last):
+    ...
+    ValueError: Value is not an integer: '12.5'
+    """
+    ## Integers are returned as they are:
+    if type(x) is int:
+        return x
+
+    ## Try the fast path for strings of digits:
+    if isinstance(x, str):
+        try:
+            return int(x)
+        except ValueError:
+            pass
+
+    ## Otherwise, convert exactly and make sure that there is no fractional part:
+    value = as_number(x) if not isinstance(x, float) else x
+    if value != int(value):
+        raise ValueError("Value is not an integer: {!r}".format(x))
+    return int(value)
+
+
+def _as_scaled(x, scale):
+    """
+    Converts the value to an integer scaled by ``10 ** scale``, rounding half to even.
+
+    :param x: The value to be converted.
+    :param scale: The number of decimal digits.
+    :return: An int.
+    """
+    ## Integers and floats are scaled directly:
+    if type(x) is int:
+        return x * 10 ** scale
+    elif type(x) is float:
+        return int(round(x * 10 ** scale))
+
+    ## Plain decimal strings with at most `scale` fractional digits are scaled by dropping the point:
+    if isinstance(x, str):
+        text = x.strip()
+        point = text.find(".")
+        digits = 0 if point < 0 else len(text) - point - 1
+        if digits <= scale and (point < 0 or not digits or text[point + 1:].isdigit()):
+            try:
+                return int(text if point < 0 else text[:point] + text[point + 1:]) * 10 ** (scale - digits)
+            except ValueError:
+                pass
+
+    ## Otherwise, scale exactly:
+    return int((as_number(x) * 10 ** scale).to_integral_value(ROUND_HALF_EVEN))
+
+
+@iffnotnull
+@iffnotblank
+def as_scaled(x, scale=2):
+    """
+    Converts the value to an integer scaled by ``10 ** scale``, such as cents for ``scale=2``, rounding half to
+    even. Scaled integers are exact and much faster to compute with than ``Decimal`` values. See :func:`scaled` for
+    casts with a fixed scale.
+
+    :param x: The value to be converted.
+    :param scale: The number of decimal digits.
+    :return: An int.
+
+    >>> as_scaled(None)
+    >>> as_scaled("")
+    ''
+    >>> [as_scaled(value) for value in ("12.34", " -0.5", "7", ".05", "1.005", "1e2", 3, 1.25, Decimal("0.1"))]
+    [1234, -50, 700, 5, 100, 10000, 300, 125, 10]
+    >>> as_scaled("1.5", scale=0)
+    2
+    """
+    return _as_scaled(x, scale)
+
+
+def scaled(scale=2):
+    """
+    Returns a cast converting values to integers scaled by ``10 ** scale`` (see :func:`as_scaled`), with the
+    vectorized version for columnar mapping.
+
+    :param scale: The number of decimal digits.
+    :return: A cast.
+
+    >>> cast = scaled(3)
+    >>> (cast(None), cast("1.5"))
+    (None, 1500)
     """
-    return Decimal(as_string(x))
+    cast = iffnotnull(iffnotblank(lambda x: _as_scaled(x, scale)))
+    cast.vectorized = partial(as_number_column, scale=scale)
+    return cast
 
 
 def as_boolean(x, predicate=None):
@@ -157,6 +579,164 @@ def as_boolean(x, predicate=None):
     return bool(x if predicate is None else predicate(x))
 
 
+#: Defines the separators of the ISO layouts parsed with ``fromisoformat``, by their positions.
+_ISO_FORMATS = {
+    "%Y-%m-%d": {4: "-", 7: "-"},
+    "%Y-%m-%d %H:%M:%S": {4: "-", 7: "-", 10: " ", 13: ":", 16: ":"},
+    "%Y-%m-%dT%H:%M:%S": {4: "-", 7: "-", 10: "T", 13: ":", 16: ":"},
+}
+
+#: Defines the fixed width directives which compiled parsers match with regular expressions, in argument order.
+_FIXED_DIRECTIVES = (("Y", 4), ("m", 2), ("d", 2), ("H", 2), ("M", 2), ("S", 2))
+
+#: Defines the compiled parsers by the type of the result and the format.
+_PARSERS = {}
+
+
+def _fixed_format(fmt):
+    """
+    Translates a format with fixed width numeric directives only into a regular expression.
+
+    :param fmt: The format.
+    :return: A tuple of the regular expression and the group indices for the arguments of
+             ``datetime.datetime`` (``None`` for missing ones), or ``None`` if the format is not supported.
+
+    >>> _fixed_format("%d/%m/%Y %H:%M")[1]
+    (2, 1, 0, 3, 4, None)
+    >>> _fixed_format("%d %b %Y")
+    """
+    widths = dict(_FIXED_DIRECTIVES)
+    pattern, groups, index = [], {}, 0
+    while index < len(fmt):
+        char, index = fmt[index], index + 1
+        if char == "%" and fmt[index:index + 1] == "%":
+            pattern.append(re.escape("%"))
+            index += 1
+        elif char == "%":
+            directive, index = fmt[index:index + 1], index + 1
+            if directive not in widths or directive in groups:
+                return None
+            groups[directive] = len(groups)
+            pattern.append(r"(\d{%d})" % widths[directive])
+        else:
+            pattern.append(re.escape(char))
+    if not all(directive in groups for directive in "Ymd"):
+        return None
+    return "".join(pattern) + r"\Z", tuple(groups.get(directive) for directive, _ in _FIXED_DIRECTIVES)
+
+
+def _compile_parser(fmt, kind):
+    """
+    Compiles a parser for the format producing instances of the kind.
+
+    :param fmt: The format.
+    :param kind: Either ``datetime.date`` or ``datetime.datetime``.
+    :return: A function accepting a string and returning a date or date/time value.
+    """
+    ## Define the fallback which also raises the errors for values not matching the format:
+    strptime = datetime.datetime.strptime
+    if kind is datetime.date:
+        fallback = lambda x: strptime(x, fmt).date()
+    else:
+        fallback = lambda x: strptime(x, fmt)
+
+    ## ISO layouts are parsed natively if the separators are in place:
+    if fmt in _ISO_FORMATS and hasattr(kind, "fromisoformat"):
+        length, fromisoformat = len(fmt.replace("%Y", "YYYY")), kind.fromisoformat
+        probe = operator.itemgetter(*sorted(_ISO_FORMATS[fmt]))
+        expected = tuple(_ISO_FORMATS[fmt][position] for position in sorted(_ISO_FORMATS[fmt]))
+
+        def parse(x):
+            if type(x) is str and len(x) == length and probe(x) == expected:
+                try:
+                    return fromisoformat(x)
+                except ValueError:
+                    pass
+            return fallback(x)
+
+        return parse
+
+    ## Formats with fixed width numeric directives are matched with regular expressions:
+    fixed = _fixed_format(fmt)
+    if fixed is not None:
+        match, order = re.compile(fixed[0]).match, fixed[1]
+        dateonly = kind is datetime.date and order[3:] == (None, None, None)
+        build = datetime.date if dateonly else datetime.datetime
+
+        def parse(x):
+            matched = match(x) if type(x) is str else None
+            if matched is not None:
+                groups = matched.groups()
+                try:
+                    value = build(*[0 if index is None else int(groups[index]) for index in order[:3 if dateonly else 6]])
+                except ValueError:
+                    pass
+                else:
+                    return value if dateonly or kind is datetime.datetime else value.date()
+            return fallback(x)
+
+        return parse
+
+    ## Otherwise, we have to use `strptime`:
+    return fallback
+
+
+def datetime_parser(fmt=None):
+    """
+    Returns the parser compiled for the date/time format.
+
+    ISO layouts are parsed with ``datetime.datetime.fromisoformat`` where available, other formats consisting of
+    fixed width numeric directives (``%Y``, ``%m``, ``%d``, ``%H``, ``%M`` and ``%S``) and literals are matched with
+    regular expressions. Values which can not be parsed so, and all other formats, fall back to ``strptime``.
+    Parsers are compiled once per format.
+
+    :param fmt: The format of the date/time strings.
+    :return: A function accepting a string and returning a ``datetime.datetime`` instance.
+
+    >>> parse = datetime_parser("%d/%m/%Y %H:%M")
+    >>> parse("31/01/2015 10:30")
+    datetime.datetime(2015, 1, 31, 10, 30)
+    >>> parse("1/1/2015 10:30")
+    datetime.datetime(2015, 1, 1, 10, 30)
+    >>> datetime_parser() is datetime_parser("%Y-%m-%d %H:%M:%S")
+    True
+    >>> datetime_parser()("2015-13-01 00:00:00")
+    Traceback (most recent call last):
+    ...
+    ValueError: time data '2015-13-01 00:00:00' does not match format '%Y-%m-%d %H:%M:%S'
+    """
+    fmt = fmt or "%Y-%m-%d %H:%M:%S"
+    parser = _PARSERS.get((datetime.datetime, fmt))
+    if parser is None:
+        parser = _PARSERS[(datetime.datetime, fmt)] = _compile_parser(fmt, datetime.datetime)
+    return parser
+
+
+def date_parser(fmt=None):
+    """
+    Returns the parser compiled for the date format. See :func:`datetime_parser` for details.
+
+    :param fmt: The format of the date strings.
+    :return: A function accepting a string and returning a ``datetime.date`` instance.
+
+    >>> date_parser()("2015-01-31")
+    datetime.date(2015, 1, 31)
+    >>> date_parser("%Y%m%d")("20150131")
+    datetime.date(2015, 1, 31)
+    >>> date_parser("%Y-%m-%d %H:%M")("2015-01-31 10:30")
+    datetime.date(2015, 1, 31)
+    >>> date_parser()("2015-02-31")
+    Traceback (most recent call last):
+    ...
+    ValueError: day is out of range for month
+    """
+    fmt = fmt or "%Y-%m-%d"
+    parser = _PARSERS.get((datetime.date, fmt))
+    if parser is None:
+        parser = _PARSERS[(datetime.date, fmt)] = _compile_parser(fmt, datetime.date)
+    return parser
+
+
 @iffnotnull
 @iffnotblank
 def as_datetime(x, fmt=None):
@@ -177,7 +757,7 @@ def as_datetime(x, fmt=None):
     >>> as_datetime("2015-01-01T00:00:00", fmt="%Y-%m-%dT%H:%M:%S")
     datetime.datetime(2015, 1, 1, 0, 0)
     """
-    return datetime.datetime.strptime(x, fmt or "%Y-%m-%d %H:%M:%S")
+    return datetime_parser(fmt)(x)
 
 
 @iffnotnull
@@ -200,435 +780,2691 @@ def as_date(x, fmt=None):
     >>> as_date("Date: 2015-01-01", fmt="Date: %Y-%m-%d")
     datetime.date(2015, 1, 1)
     """
-    return datetime.datetime.strptime(x, fmt or "%Y-%m-%d").date()
+    return date_parser(fmt)(x)
 
 
-class Value:
+#: Defines the result of vectorized casts, ie. the NumPy array of cast values, the boolean NumPy arrays marking null
+#: and blank raw values, and the categories for factors (``None`` otherwise).
+CastColumn = collections.namedtuple("CastColumn", ["data", "null", "blank", "categories"])
+
+
+def _column_masks(values):
     """
-    Defines an immutable *[sic.]* boxed value with message, status and extra data as payload if required.
+    Returns the null and blank masks of the raw values.
 
-    >>> value = Value(value=42, message=None, status=Value.Status.Success, extras="41 + 1")
-    >>> value.value
-    42
-    >>> value.message
-    >>> value.status == Value.Status.Success
-    True
-    >>> value.extras
-    '41 + 1'
-    >>> value = Value.success(42, date="2015-01-01")
-    >>> value.value
-    42
-    >>> value.status == Value.Status.Success
-    True
-    >>> value.date
-    '2015-01-01'
-    >>> value = Value.warning(value="fortytwo", message="Failed to convert to integer.", date="2015-01-01")
-    >>> value.value
-    'fortytwo'
-    >>> value.status == Value.Status.Warning
-    True
-    >>> value.date
-    '2015-01-01'
-    >>> value.message
-    'Failed to convert to integer.'
-    >>> value = Value.error(message="Failed to compute the value.", date="2015-01-01")
-    >>> value.value
-    >>> value.status == Value.Status.Error
-    True
-    >>> value.date
-    '2015-01-01'
-    >>> value.message
-    'Failed to compute the value.'
+    :param values: A sequence of raw values.
+    :return: A tuple of boolean NumPy arrays.
     """
+    import numpy
+    null = numpy.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    blank = numpy.fromiter((isinstance(value, str) and value == "" for value in values), dtype=bool, count=len(values))
+    return null, blank
 
-    class Status:
-        """
-        Defines an enumeration for value status.
-        """
 
-        #: Indicates that value is mapped successfully.
-        Success = 1
+def _column_texts(values, missing, fill, strip=True):
+    """
+    Returns the raw values as a NumPy string array, missing values replaced with the fill value.
 
-        #: Indicates that value is mapped successfully with warnings.
-        Warning = 2
+    NumPy strings can not end with NUL characters, hence the strings are returned in a NumPy object array if any
+    raw value ends with one.
 
-        #: Indicates that value could not be mapped successfully.
-        Error = 3
+    :param values: A sequence of raw values.
+    :param missing: The boolean NumPy array marking missing values.
+    :param fill: The string to be used for missing values.
+    :param strip: Indicates if the strings shall be trimmed.
+    :return: A NumPy string or object array.
+    """
+    import numpy
+    texts = [fill if flag else value for value, flag in zip(values, missing)]
+    if any(isinstance(text, str) and text.endswith("\x00") for text in texts):
+        return numpy.array([str(text).strip() if strip else str(text) for text in texts], dtype=object)
+    texts = numpy.array(texts, dtype=str)
+    return numpy.char.strip(texts) if strip else texts
 
-    def __init__(self, value=None, message=None, status=None, **kwargs):
-        """
-        Constructs an immutable Value class instance.
 
-        Note that the classmethods `success`, `warning` and `error` should be preferred over this
-        constructor.
+#: Defines the formats which NumPy can parse natively, with the expected length and the separator at index 10.
+_COLUMN_FORMATS = {
+    "%Y-%m-%d": (10, None),
+    "%Y-%m-%d %H:%M:%S": (19, " "),
+    "%Y-%m-%dT%H:%M:%S": (19, "T"),
+}
 
-        :param value: The atomic value.
-        :param message: Any messages if required.
-        :param status: The value status.
-        :param kwargs: Extra payload for the value.
-        """
-        self.__value = value
-        self.__status = status or self.Status.Success
-        self.__message = message
-        self.__payload = kwargs
 
-    @property
-    def value(self):
-        return self.__value
+def _as_datetime64_column(values, fmt, unit, cast):
+    """
+    Converts raw values to a NumPy datetime64 array, parsing natively where the format allows.
 
-    @property
-    def status(self):
-        return self.__status
+    Values which do not match the layout of the format, such as ``"2015-1-01"`` for ``"%Y-%m-%d"``, are parsed with
+    the scalar cast instead. If NumPy fails to parse the others, the whole column is parsed with the scalar cast.
 
-    @property
-    def message(self):
-        return self.__message
+    :param values: A sequence of raw values.
+    :param fmt: The format of the date/time strings.
+    :param unit: The datetime64 unit.
+    :param cast: The scalar cast to fall back to.
+    :return: A :class:`CastColumn` instance.
+    """
+    import numpy
+    null, blank = _column_masks(values)
+    missing = null | blank
+    dtype = "datetime64[{}]".format(unit)
+
+    ## Parse natively if the format allows, falling back to the scalar cast for the values not matching its layout:
+    data, texts = None, None
+    if fmt in _COLUMN_FORMATS:
+        length, separator = _COLUMN_FORMATS[fmt]
+        fill = "1970-01-01" if separator is None else "1970-01-01{}00:00:00".format(separator)
+        texts = _column_texts(values, missing, fill, strip=False)
+
+    ## NumPy parses strings only, not the Python strings kept for the values ending with NUL characters:
+    if texts is not None and texts.dtype.kind == "U":
+        others = numpy.char.str_len(texts) != length
+        if separator is not None:
+            others |= ~numpy.char.startswith(texts, separator, 10)
+        texts[others] = fill
+        try:
+            data = texts.astype(dtype)
+        except ValueError:
+            pass
+        else:
+            for index in others.nonzero()[0]:
+                data[index] = cast(values[index], fmt)
 
-    @property
-    def payload(self):
-        return self.__payload
+    ## Parse with the scalar cast if we could not parse natively:
+    if data is None:
+        data = numpy.array([None if flag else cast(value, fmt) for value, flag in zip(values, missing)], dtype=dtype)
 
-    def __getattr__(self, item):
-        """
-        Provides access to payload through attributes.
+    ## Mark missing values and return:
+    data[missing] = numpy.datetime64("NaT")
+    return CastColumn(data, null, blank, None)
 
-        :param item: The name of the attribute.
-        :return: The value for the attribute if the attribute name is in payload.
-        """
-        ## Check if the item is in the payload:
-        if item in self.payload:
-            ## Yes, return it.
-            return self.payload.get(item)
 
-        ## Nope, escalate:
-        return super(Value, self).__getattr__(item)
+def as_string_column(values):
+    """
+    Converts the raw values to trimmed strings at once. Vectorized version of :func:`as_string`.
 
-    @classmethod
-    def success(cls, value=None, message=None, **kwargs):
-        """
-        Provides a convenience constructor for successful Value instances.
+    Missing values are represented as empty strings in the data. The data is a NumPy object array if any string
+    ends with a NUL character.
 
-        :param value: The value of the Value instance to be constructed.
-        :param message: The message, if any.
-        :param kwargs: Extra payload for the value.
-        :return: A successful Value instance.
-        """
-        return cls(value=value, message=message, status=cls.Status.Success, **kwargs)
+    :param values: A sequence of raw values.
+    :return: A :class:`CastColumn` instance.
+    """
+    null, blank = _column_masks(values)
+    return CastColumn(_column_texts(values, null, ""), null, blank, None)
 
-    @classmethod
-    def warning(cls, value=None, message=None, **kwargs):
-        """
-        Provides a convenience constructor for Values instances with warnings.
 
-        :param value: The value of the Value instance to be constructed.
-        :param message: The message, if any.
-        :param kwargs: Extra payload for the value.
-        :return: A Value instance with warnings.
-        """
-        return cls(value=value, message=message, status=cls.Status.Warning, **kwargs)
+def as_factor_column(values):
+    """
+    Converts the raw values to factors at once. Vectorized version of :func:`as_factor`.
 
-    @classmethod
-    def error(cls, value=None, message=None, **kwargs):
-        """
-        Provides a convenience constructor for Values instances with errors.
+    The data is the array of integer codes into the sorted categories. Null values have the code ``-1``. The
+    categories are a NumPy object array of strings, as up-casing may change the length of strings.
 
-        :param value: The value of the Value instance to be constructed.
-        :param message: The message, if any.
-        :param kwargs: Extra payload for the value.
-        :return: A Value instance with errors.
-        """
-        return cls(value=value, message=message, status=cls.Status.Error, **kwargs)
+    :param values: A sequence of raw values.
+    :return: A :class:`CastColumn` instance.
+    """
+    import numpy
+    null, blank = _column_masks(values)
+    texts = numpy.array([as_factor(value) for value, flag in zip(values, null) if not flag], dtype=object)
+    categories, codes = numpy.unique(texts, return_inverse=True)
+    data = numpy.full(len(values), -1, dtype="int64")
+    data[~null] = codes
+    return CastColumn(data, null, blank, categories)
 
 
-class Field(object):
+def as_number_column(values, dtype="float64", scale=None):
     """
-    Provides a concrete mapper field.
+    Converts the raw values to numbers at once. Vectorized version of :func:`as_number`.
 
-    >>> field = Field()
-    >>> field.map(None, dict()).value
-    >>> field.map(None, dict()).status == Value.Status.Success
-    True
-    >>> field = Field(null=False)
-    >>> field.map(None, dict()).value
-    >>> field.map(None, dict()).status == Value.Status.Error
+    Missing values are ``NaN`` for floating point data and ``0`` for integer data. If ``scale`` is given, numbers
+    are parsed as ``float64`` and returned as ``int64`` integers scaled by ``10 ** scale``, such as cents for
+    ``scale=2``, which is exact up to 15 significant digits.
+
+    :param values: A sequence of raw values.
+    :param dtype: The NumPy data type of the numbers.
+    :param scale: The number of decimal digits of scaled integers, if required.
+    :return: A :class:`CastColumn` instance.
+    """
+    import numpy
+    null, blank = _column_masks(values)
+    missing = null | blank
+    texts = _column_texts(values, missing, "0")
+    if scale is None:
+        data = texts.astype(dtype)
+    else:
+        data = numpy.rint(texts.astype("float64") * 10 ** scale).astype("int64")
+    if data.dtype.kind == "f":
+        data[missing] = numpy.nan
+    return CastColumn(data, null, blank, None)
+
+
+def as_integer_column(values):
+    """
+    Converts the raw values to integers at once. Vectorized version of :func:`as_integer`.
+
+    Integral strings are parsed as ``int64`` integers directly. Otherwise, numbers are parsed as ``float64`` and
+    rejected if they have fractional parts, so that ``"12.0"`` is accepted like :func:`as_integer` does. If any
+    integer does not fit into ``int64``, the data is a NumPy object array of integers cast by :func:`as_integer`.
+    Missing values are ``0``.
+
+    :param values: A sequence of raw values.
+    :return: A :class:`CastColumn` instance.
+    """
+    import numpy
+    null, blank = _column_masks(values)
+    missing = null | blank
+    texts = _column_texts(values, missing, "0")
+    try:
+        data = texts.astype("int64")
+    except OverflowError:
+        data = None
+    except ValueError:
+        numbers = texts.astype("float64")
+        fractional = ~numpy.isfinite(numbers) | (numbers != numpy.trunc(numbers))
+        if fractional.any():
+            raise ValueError("Value is not an integer: {!r}".format(values[fractional.nonzero()[0][0]]))
+        data = numbers.astype("int64") if (numpy.abs(numbers) < 2.0 ** 63).all() else None
+
+    ## Fall back to Python integers if any does not fit into int64:
+    if data is None:
+        data = numpy.array([0 if flag else as_integer(value) for value, flag in zip(values, missing)], dtype=object)
+
+    ## Done, return:
+    return CastColumn(data, null, blank, None)
+
+
+def as_boolean_column(values, predicate=None):
+    """
+    Converts the raw values to booleans at once. Vectorized version of :func:`as_boolean`.
+
+    :param values: A sequence of raw values.
+    :param predicate: The predicate function if required.
+    :return: A :class:`CastColumn` instance.
+    """
+    import numpy
+    null, blank = _column_masks(values)
+    data = numpy.fromiter((as_boolean(value, predicate) for value in values), dtype=bool, count=len(values))
+    return CastColumn(data, null, blank, None)
+
+
+def as_datetime_column(values, fmt=None):
+    """
+    Converts the raw values to date/time values at once. Vectorized version of :func:`as_datetime`.
+
+    ISO layouts are parsed by NumPy, other formats fall back to :func:`as_datetime`. Missing values are ``NaT``.
+
+    :param values: A sequence of raw values.
+    :param fmt: The format of the date/time strings.
+    :return: A :class:`CastColumn` instance.
+    """
+    return _as_datetime64_column(values, fmt or "%Y-%m-%d %H:%M:%S", "us", as_datetime)
+
+
+def as_date_column(values, fmt=None):
+    """
+    Converts the raw values to dates at once. Vectorized version of :func:`as_date`.
+
+    ISO layouts are parsed by NumPy, other formats fall back to :func:`as_date`. Missing values are ``NaT``.
+
+    :param values: A sequence of raw values.
+    :param fmt: The format of the date strings.
+    :return: A :class:`CastColumn` instance.
+    """
+    return _as_datetime64_column(values, fmt or "%Y-%m-%d", "D", as_date)
+
+
+## Attach the vectorized versions to the casts for columnar mapping:
+as_string.vectorized = as_string_column
+as_factor.vectorized = as_factor_column
+as_number.vectorized = as_number_column
+as_float.vectorized = as_number_column
+as_integer.vectorized = as_integer_column
+as_boolean.vectorized = as_boolean_column
+as_datetime.vectorized = as_datetime_column
+as_date.vectorized = as_date_column
+
+
+class LRU(object):
+    """
+    Provides a bounded cache which evicts the least recently used entries, counting hits, misses and evictions.
+
+    >>> cache = LRU(2)
+    >>> cache.put("a", 1)
+    >>> cache.put("b", 2)
+    >>> cache.get("a")
+    1
+    >>> cache.put("c", 3)
+    >>> cache.get("b", "missing")
+    'missing'
+    >>> (cache.hits, cache.misses, cache.evictions, len(cache))
+    (1, 1, 1, 2)
+    >>> cache.hit_rate
+    0.5
+    """
+
+    def __init__(self, maxsize=65536):
+        """
+        Constructs a cache.
+
+        :param maxsize: The maximum number of entries.
+        """
+        if maxsize < 1:
+            raise ValueError("Cache size must be a positive integer.")
+        self.__maxsize = maxsize
+        self.__data = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    @property
+    def maxsize(self):
+        """
+        Returns the maximum number of entries.
+        """
+        return self.__maxsize
+
+    @property
+    def hits(self):
+        """
+        Returns the number of lookups which found an entry.
+        """
+        return self.__hits
+
+    @property
+    def misses(self):
+        """
+        Returns the number of lookups which did not find an entry.
+        """
+        return self.__misses
+
+    @property
+    def evictions(self):
+        """
+        Returns the number of entries evicted to make room for new ones.
+        """
+        return self.__evictions
+
+    @property
+    def hit_rate(self):
+        """
+        Returns the ratio of hits to lookups, ``0.0`` if there was no lookup.
+        """
+        lookups = self.__hits + self.__misses
+        return float(self.__hits) / lookups if lookups else 0.0
+
+    def __len__(self):
+        return len(self.__data)
+
+    def __contains__(self, key):
+        """
+        Indicates if there is an entry for the key, without marking it as used or counting a lookup.
+
+        :param key: The key.
+        :return: ``True`` if there is an entry for the key, ``False`` otherwise (also for unhashable keys).
+        """
+        try:
+            return key in self.__data
+        except TypeError:
+            return False
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        :return: A dictionary of counters and the hit rate.
+        """
+        return {"size": len(self.__data), "maxsize": self.__maxsize, "hits": self.__hits, "misses": self.__misses,
+                "evictions": self.__evictions, "hit_rate": self.hit_rate}
+
+    def get(self, key, default=None):
+        """
+        Returns the entry for the key, marking it as the most recently used one.
+
+        :param key: The key.
+        :param default: The value to be returned if there is no entry for the key.
+        :return: The entry or the default.
+        """
+        try:
+            value = self.__data.pop(key)
+        except KeyError:
+            self.__misses += 1
+            return default
+        self.__data[key] = value
+        self.__hits += 1
+        return value
+
+    def put(self, key, value):
+        """
+        Adds or replaces the entry for the key, evicting the least recently used entry if the cache is full.
+
+        :param key: The key.
+        :param value: The value.
+        """
+        if key in self.__data:
+            del self.__data[key]
+        elif len(self.__data) >= self.__maxsize:
+            self.__data.popitem(last=False)
+            self.__evictions += 1
+        self.__data[key] = value
+
+    def clear(self):
+        """
+        Removes all entries and resets the counters.
+        """
+        self.__data.clear()
+        self.__hits = self.__misses = self.__evictions = 0
+
+
+def cached(cast, cache=None):
+    """
+    Memoizes a cast on its (first and only) argument.
+
+    Results are cached by the type and the value of the argument, so ``1`` and ``True`` do not collide. ``float``
+    and ``Decimal`` arguments are cached by their representations instead, since values comparing equal, such as
+    ``Decimal("1")`` and ``Decimal("1.0")`` or ``0.0`` and ``-0.0``, may be cast differently. Values of other types
+    comparing equal are assumed to be cast equally. Calls with additional arguments or unhashable values are not
+    cached. Only casts returning immutable values should be memoized. The cache is available as the ``cache``
+    attribute of the returned function.
+
+    If the cast applies guards (see :func:`iffnotnull` and :func:`iffnotblank`), the guards are checked before the
+    cache is looked up and only the unguarded function is memoized.
+
+    :param cast: The cast to be memoized.
+    :param cache: The :class:`LRU` instance to be used, a new one with the default size if ``None``.
+    :return: The memoized cast.
+
+    >>> cast = cached(as_date, LRU(100))
+    >>> cast("2015-01-01")
+    datetime.date(2015, 1, 1)
+    >>> cast("2015-01-01")
+    datetime.date(2015, 1, 1)
+    >>> cast(None)
+    >>> (cast.cache.hits, cast.cache.misses)
+    (1, 1)
+    >>> cast = cached(as_string)
+    >>> [cast(value) for value in (Decimal("1.0"), Decimal("1"), 0.0, -0.0)]
+    ['1.0', '1', '0.0', '-0.0']
+    """
+    ## Get the cache:
+    cache = LRU() if cache is None else cache
+    get, put = cache.get, cache.put
+
+    ## Get the guards and the unguarded function to be memoized:
+    guards, core = _fusion(cast)
+
+    @wraps(core)
+    def wrapper(value, *args, **kwargs):
+        ## Do not cache calls with additional arguments:
+        if args or kwargs:
+            return core(value, *args, **kwargs)
+
+        ## Get the key, skipping unhashable values:
+        kind = type(value)
+        if kind is str:
+            key = value
+        elif kind is float or kind is Decimal:
+            key = (kind, repr(value))
+        else:
+            key = (kind, value)
+        try:
+            result = get(key, _MISSING)
+        except TypeError:
+            return core(value)
+
+        ## Compute and save if required:
+        if result is _MISSING:
+            result = core(value)
+            put(key, result)
+
+        ## Done, return:
+        return result
+
+    ## Guard the memoized function, if required:
+    if guards:
+        wrapper = _fuse(wraps(cast)(_guard(wrapper, guards)), guards, wrapper)
+
+    ## Expose the cache and return:
+    wrapper.cache = cache
+    return wrapper
+
+
+#: Defines the types of simple values which are described by their representations.
+_SIMPLE_TYPES = (type(None), bool, int, float, str, bytes, Decimal, datetime.date, datetime.time)
+
+
+def _global_names(code):
+    """
+    Returns the names the code object and the code objects nested in it refer to.
+
+    :param code: The code object.
+    :return: A set of names.
+    """
+    names = set(code.co_names)
+    for constant in code.co_consts:
+        if inspect.iscode(constant):
+            names |= _global_names(constant)
+    return names
+
+
+def _describe(obj, seen=None):
+    """
+    Describes the object for schema hashes, ie. functions by their names, byte code, constants, defaults, closures and
+    the module-level functions and simple values they refer to (recursively), fields by their types and attributes,
+    simple values by their representations and other objects by their types.
+
+    Mutable module-level values, such as caches, are not described since they may change from one run to another.
+
+    :param obj: The object to be described.
+    :param seen: The identities of the objects described so far on the path, to stop at cycles.
+    :return: A string.
+
+    >>> _describe(lambda x: x + 1) == _describe(lambda x: x + 1)
     True
-    >>> field = Field(func=lambda i, r: r.get("a", None))
-    >>> field.map(None, dict(a="")).value
-    ''
-    >>> field.map(None, dict(a="")).status == Value.Status.Success
+    >>> _describe(lambda x: x + 1) == _describe(lambda x: x + 2)
+    False
+    >>> def helper(x):
+    ...     return x + 1
+    >>> def func(x):
+    ...     return helper(x)
+    >>> before = _describe(func)
+    >>> def helper(x):
+    ...     return x + 2
+    >>> _describe(func) == before
+    False
+    """
+    ## Stop at cycles:
+    seen = seen or frozenset()
+    if id(obj) in seen:
+        return "<cycle>"
+    seen = seen | frozenset([id(obj)])
+    describe = lambda item: _describe(item, seen)
+
+    ## Simple values and containers:
+    if isinstance(obj, _SIMPLE_TYPES):
+        return repr(obj)
+    elif isinstance(obj, (list, tuple)):
+        return "({})".format(", ".join(describe(item) for item in obj))
+    elif isinstance(obj, (set, frozenset)):
+        return "{{{}}}".format(", ".join(sorted(describe(item) for item in obj)))
+    elif isinstance(obj, dict):
+        return "{{{}}}".format(", ".join(sorted("{}: {}".format(describe(k), describe(v)) for k, v in obj.items())))
+
+    ## Fields are described by their types and attributes:
+    if isinstance(obj, Field):
+        attributes = [(name, getattr(obj, name)) for name in ("name", "key", "func", "cast", "blank", "null", "depends",
+                                                              "resolver", "default") if hasattr(obj, name)]
+        return "{}.{}({})".format(type(obj).__module__, type(obj).__name__,
+                                  ", ".join("{}={}".format(name, describe(value)) for name, value in attributes))
+
+    ## Functions are described down to their byte code:
+    if inspect.iscode(obj):
+        return "code({}, {}, {})".format(binascii.hexlify(obj.co_code).decode("ascii"), describe(obj.co_consts),
+                                         describe(obj.co_names))
+    elif isinstance(obj, partial):
+        return "partial({}, {}, {})".format(describe(obj.func), describe(obj.args), describe(obj.keywords))
+    elif inspect.ismethod(obj):
+        return "method({}, {})".format(type(obj.__self__).__name__, describe(obj.__func__))
+    elif inspect.isfunction(obj):
+        closure = [cell.cell_contents for cell in obj.__closure__ or ()]
+        scope = obj.__globals__
+        referenced = [(name, scope[name]) for name in sorted(_global_names(obj.__code__)) if name in scope and
+                      (inspect.isfunction(scope[name]) or isinstance(scope[name], _SIMPLE_TYPES))]
+        return "function({}.{}, {}, {}, {}, {})".format(obj.__module__, obj.__name__, describe(obj.__code__),
+                                                        describe(obj.__defaults__), describe(closure),
+                                                        describe(referenced))
+    elif inspect.isbuiltin(obj) or inspect.isclass(obj):
+        return "{}.{}".format(getattr(obj, "__module__", None), obj.__name__)
+
+    ## Other objects are described by their types:
+    return "<{}.{}>".format(type(obj).__module__, type(obj).__name__)
+
+
+class PersistentCache(object):
+    """
+    Provides a row cache persisted in an SQLite database, to be used as the :attr:`Record.row_cache` of record
+    classes so that unchanged raw records are loaded from the database on re-runs instead of being mapped again.
+
+    Entries are keyed by the name of the record class, its schema hash (see :meth:`Record.schema_hash`) and the
+    digest of the fingerprint of the raw record. Entries of the record class for other schema hashes are deleted
+    when the record class is first seen, hence the cache is invalidated whenever fields, casts or functions change.
+
+    Value slots are pickled, hence the database must be trusted. Changes are committed every ``commit_every``
+    entries added, on :meth:`flush` and on :meth:`close`.
+
+    >>> class TestRecord(Record):
+    ...     a = KeyField(cast=as_number)
+    >>> TestRecord.row_cache = cache = PersistentCache(":memory:")
+    >>> [record.a for record in TestRecord.map_many([dict(a="1"), dict(a="2")])]
+    [Decimal('1'), Decimal('2')]
+    >>> [record.a for record in TestRecord.map_many([dict(a="2"), dict(a="3")], changed_only=True)]
+    [Decimal('3')]
+    >>> [record.a for record in TestRecord.map_many([dict(a="1"), dict(a="3")])]
+    [Decimal('1'), Decimal('3')]
+    >>> (len(cache), cache.hits, cache.misses)
+    (3, 2, 3)
+    >>> cache.close()
+    """
+
+    def __init__(self, path, commit_every=1000):
+        """
+        Constructs a persistent cache.
+
+        :param path: The path to the SQLite database file.
+        :param commit_every: The number of entries to be added before changes are committed.
+        """
+        import sqlite3
+        self.__connection = sqlite3.connect(path)
+        self.__connection.execute("CREATE TABLE IF NOT EXISTS normalazy_rows (name TEXT, schema TEXT, key BLOB, "
+                                  "value BLOB, PRIMARY KEY (name, schema, key))")
+        self.__commit_every = commit_every
+        self.__pending = 0
+        self.__schemas = {}
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self):
+        """
+        Returns the number of lookups which found an entry.
+        """
+        return self.__hits
+
+    @property
+    def misses(self):
+        """
+        Returns the number of lookups which did not find an entry.
+        """
+        return self.__misses
+
+    def __len__(self):
+        return self.__connection.execute("SELECT COUNT(*) FROM normalazy_rows").fetchone()[0]
+
+    def __locate(self, key):
+        """
+        Returns the name of the record class, its schema hash and the digest of the fingerprint, deleting the
+        entries of the record class for other schema hashes when the record class is first seen.
+
+        :param key: The fingerprint of the raw record, starting with the record class.
+        :return: A tuple of the name, the schema hash and the digest.
+        """
+        ## Get the name and the schema hash of the record class:
+        record_cls = key[0]
+        located = self.__schemas.get(record_cls)
+        if located is None:
+            located = self.__schemas[record_cls] = ("{}.{}".format(record_cls.__module__, record_cls.__name__),
+                                                    record_cls.schema_hash())
+            self.__connection.execute("DELETE FROM normalazy_rows WHERE name = ? AND schema != ?", located)
+
+        ## Done, return with the digest of the raw values:
+        return located + (hashlib.sha1(repr(key[1:]).encode("utf-8")).digest(),)
+
+    def __contains__(self, key):
+        query = "SELECT 1 FROM normalazy_rows WHERE name = ? AND schema = ? AND key = ?"
+        return self.__connection.execute(query, self.__locate(key)).fetchone() is not None
+
+    def get(self, key, default=None):
+        """
+        Returns the entry for the key.
+
+        :param key: The fingerprint of the raw record, starting with the record class.
+        :param default: The value to be returned if there is no entry for the key.
+        :return: The entry or the default.
+        """
+        query = "SELECT value FROM normalazy_rows WHERE name = ? AND schema = ? AND key = ?"
+        row = self.__connection.execute(query, self.__locate(key)).fetchone()
+        if row is None:
+            self.__misses += 1
+            return default
+        self.__hits += 1
+        return pickle.loads(bytes(row[0]))
+
+    def put(self, key, value):
+        """
+        Adds or replaces the entry for the key.
+
+        :param key: The fingerprint of the raw record, starting with the record class.
+        :param value: The value slots.
+        """
+        query = "INSERT OR REPLACE INTO normalazy_rows (name, schema, key, value) VALUES (?, ?, ?, ?)"
+        self.__connection.execute(query, self.__locate(key) + (pickle.dumps(value, pickle.HIGHEST_PROTOCOL),))
+        self.__pending += 1
+        if self.__pending >= self.__commit_every:
+            self.flush()
+
+    def stats(self):
+        """
+        Returns the counters of the cache.
+
+        :return: A dictionary of counters and the hit rate.
+        """
+        lookups = self.__hits + self.__misses
+        return {"size": len(self), "hits": self.__hits, "misses": self.__misses,
+                "hit_rate": float(self.__hits) / lookups if lookups else 0.0}
+
+    def flush(self):
+        """
+        Commits the changes.
+        """
+        self.__connection.commit()
+        self.__pending = 0
+
+    def close(self):
+        """
+        Commits the changes and closes the database.
+        """
+        self.flush()
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class Value(object):
+    """
+    Defines an immutable *[sic.]* boxed value with message, status and extra data as payload if required.
+
+    Values are slotted and the payload is stored only if there is one. Successful ``None`` and blank values
+    without message and payload are shared:
+
+    >>> Value.success() is Value.success(None)
     True
-    >>> field = Field(func=lambda i, r: r.get("a", None), blank=False)
-    >>> field.map(None, dict(a="")).value
-    ''
-    >>> field.map(None, dict(a="")).status == Value.Status.Error
+    >>> Value.success("") is Value.success(value="")
     True
-    >>> field = Field(func=lambda i, r: r.get("a", None))
-    >>> field.map(None, dict()).value
-    >>> field.map(None, dict(a=1)).value
-    1
-    >>> field.map(None, dict(a=1)).status == Value.Status.Success
+    >>> Value.success("", message="Blank.") is Value.success("")
+    False
+
+    The payload is created on first access, hence it can be updated in place. The payload of shared values is
+    read-only:
+
+    >>> value = Value.success(42)
+    >>> value.payload["source"] = "db"
+    >>> (value.payload, value.source)
+    ({'source': 'db'}, 'db')
+    >>> dict(Value.success(None).payload)
+    {}
+
+    >>> value = Value(value=42, message=None, status=Value.Status.Success, extras="41 + 1")
+    >>> value.value
+    42
+    >>> value.message
+    >>> value.status == Value.Status.Success
+    True
+    >>> value.extras
+    '41 + 1'
+    >>> value = Value.success(42, date="2015-01-01")
+    >>> value.value
+    42
+    >>> value.status == Value.Status.Success
+    True
+    >>> value.date
+    '2015-01-01'
+    >>> value = Value.warning(value="fortytwo", message="Failed to convert to integer.", date="2015-01-01")
+    >>> value.value
+    'fortytwo'
+    >>> value.status == Value.Status.Warning
+    True
+    >>> value.date
+    '2015-01-01'
+    >>> value.message
+    'Failed to convert to integer.'
+    >>> value = Value.error(message="Failed to compute the value.", date="2015-01-01")
+    >>> value.value
+    >>> value.status == Value.Status.Error
     True
+    >>> value.date
+    '2015-01-01'
+    >>> value.message
+    'Failed to compute the value.'
+    """
+
+    class Status:
+        """
+        Defines an enumeration for value status.
+        """
+
+        #: Indicates that value is mapped successfully.
+        Success = 1
+
+        #: Indicates that value is mapped successfully with warnings.
+        Warning = 2
+
+        #: Indicates that value could not be mapped successfully.
+        Error = 3
+
+    __slots__ = ("__value", "__status", "__message", "__payload")
+
+    def __init__(self, value=None, message=None, status=None, **kwargs):
+        """
+        Constructs an immutable Value class instance.
+
+        Note that the classmethods `success`, `warning` and `error` should be preferred over this
+        constructor.
+
+        :param value: The atomic value.
+        :param message: Any messages if required.
+        :param status: The value status.
+        :param kwargs: Extra payload for the value.
+        """
+        self.__value = value
+        self.__status = status or self.Status.Success
+        self.__message = message
+        self.__payload = kwargs or None
+
+    @property
+    def value(self):
+        return self.__value
+
+    @property
+    def status(self):
+        return self.__status
+
+    @property
+    def message(self):
+        return self.__message
+
+    @property
+    def payload(self):
+        ## Create the payload on first access, unless the value is shared:
+        if self.__payload is None:
+            if self is _SUCCESS_NONE or self is _SUCCESS_BLANK:
+                return _SHARED_PAYLOAD
+            self.__payload = {}
+        return self.__payload
+
+    def __getattr__(self, item):
+        """
+        Provides access to payload through attributes.
+
+        :param item: The name of the attribute.
+        :return: The value for the attribute if the attribute name is in payload.
+        """
+        ## Check if the item is in the payload (Note that slots are not set yet while unpickling):
+        payload = self.__payload if not item.startswith("_Value__") else None
+        if payload and item in payload:
+            ## Yes, return it.
+            return payload[item]
+
+        ## Nope, escalate:
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, item))
+
+    def __reduce__(self):
+        """
+        Provides a compact pickle representation of the value.
+
+        >>> import pickle
+        >>> value = pickle.loads(pickle.dumps(Value.warning(42, message="Hmm.", date="2015-01-01")))
+        >>> (value.value, value.status == Value.Status.Warning, value.message, value.date)
+        (42, True, 'Hmm.', '2015-01-01')
+        """
+        ## Payload is rare, do not pickle it unless we have it:
+        if self.__payload:
+            return self.__class__, (self.__value, self.__message, self.__status), self.__payload
+        return self.__class__, (self.__value, self.__message, self.__status)
+
+    def __setstate__(self, state):
+        """
+        Restores the payload of the unpickled value.
+
+        :param state: The payload.
+        """
+        self.__payload = state
+
+    @classmethod
+    def success(cls, value=None, message=None, **kwargs):
+        """
+        Provides a convenience constructor for successful Value instances.
+
+        :param value: The value of the Value instance to be constructed.
+        :param message: The message, if any.
+        :param kwargs: Extra payload for the value.
+        :return: A successful Value instance.
+        """
+        ## Share the common successful values without message and payload:
+        if cls is Value and message is None and not kwargs:
+            if value is None:
+                return _SUCCESS_NONE
+            elif type(value) is str and value == "":
+                return _SUCCESS_BLANK
+        return cls(value=value, message=message, status=cls.Status.Success, **kwargs)
+
+    @classmethod
+    def warning(cls, value=None, message=None, **kwargs):
+        """
+        Provides a convenience constructor for Values instances with warnings.
+
+        :param value: The value of the Value instance to be constructed.
+        :param message: The message, if any.
+        :param kwargs: Extra payload for the value.
+        :return: A Value instance with warnings.
+        """
+        return cls(value=value, message=message, status=cls.Status.Warning, **kwargs)
+
+    @classmethod
+    def error(cls, value=None, message=None, **kwargs):
+        """
+        Provides a convenience constructor for Values instances with errors.
+
+        :param value: The value of the Value instance to be constructed.
+        :param message: The message, if any.
+        :param kwargs: Extra payload for the value.
+        :return: A Value instance with errors.
+        """
+        return cls(value=value, message=message, status=cls.Status.Error, **kwargs)
+
+
+#: Defines the read-only empty payload of the shared values (a plain dictionary on Python 2).
+_SHARED_PAYLOAD = getattr(types, "MappingProxyType", dict)({})
+
+#: Defines the shared successful ``None`` value.
+_SUCCESS_NONE = Value(None, status=Value.Status.Success)
+
+#: Defines the shared successful blank value.
+_SUCCESS_BLANK = Value("", status=Value.Status.Success)
+
+
+def _profiled(profile, fetch, cast=None, treat=None):
+    """
+    Returns a mapper which maps as the mapper compiled from the stages of a field, timing each stage.
+
+    :param profile: The :class:`FieldProfile` instance to add the timings and the resulting value to.
+    :param fetch: The function accepting the instance and the raw record and returning the raw value.
+    :param cast: The cast to be applied to the raw value, if any.
+    :param treat: The treatment function boxing the value, if any.
+    :return: A function accepting the instance and the raw record, returning a Value instance.
+    """
+    clock, add = _clock, profile.add
+
+    def mapper(instance, record):
+        ## Fetch the raw value:
+        start = clock()
+        value = fetch(instance, record)
+        fetched = clock()
+
+        ## Cast the value, if required:
+        if cast is not None:
+            if isinstance(value, Value):
+                value = Value(value=cast(value.value), status=value.status, message=value.message)
+            else:
+                value = cast(value)
+        casted = clock()
+
+        ## Treat the value, if required:
+        if treat is not None:
+            value = treat(value)
+        treated = clock()
+
+        ## Add the timings and the value to the profile and return:
+        add(value, fetched - start, casted - fetched, treated - casted)
+        return value
+
+    return mapper
+
+
+class Field(object):
+    """
+    Provides a concrete mapper field.
+
+    >>> field = Field()
+    >>> field.map(None, dict()).value
+    >>> field.map(None, dict()).status == Value.Status.Success
+    True
+    >>> field = Field(null=False)
+    >>> field.map(None, dict()).value
+    >>> field.map(None, dict()).status == Value.Status.Error
+    True
+    >>> field = Field(func=lambda i, r: r.get("a", None))
+    >>> field.map(None, dict(a="")).value
+    ''
+    >>> field.map(None, dict(a="")).status == Value.Status.Success
+    True
+    >>> field = Field(func=lambda i, r: r.get("a", None), blank=False)
+    >>> field.map(None, dict(a="")).value
+    ''
+    >>> field.map(None, dict(a="")).status == Value.Status.Error
+    True
+    >>> field = Field(func=lambda i, r: r.get("a", None))
+    >>> field.map(None, dict()).value
+    >>> field.map(None, dict(a=1)).value
+    1
+    >>> field.map(None, dict(a=1)).status == Value.Status.Success
+    True
+    """
+
+    def __init__(self, name=None, func=None, blank=True, null=True, depends=None):
+        """
+        Constructs a mapper field with the given argument.
+
+        :param name: The name of the field.
+        :param func: The function which is to be used to map the value.
+        :param blank: Boolean indicating if blank values are allowed.
+        :param null: Boolean indicating if null values are allowed.
+        :param depends: The names of the fields the value depends on, traced on evaluation if ``None``.
+        """
+        self.__name = name
+        self.__func = func
+        self.__blank = blank
+        self.__null = null
+        self.__depends = None if depends is None else tuple(depends)
+
+    @property
+    def name(self):
+        """
+        Returns the name of the field.
+
+        :return: The name of the field.
+        """
+        return self.__name
+
+    @property
+    def func(self):
+        """
+        Returns the mapping function of the field.
+
+        :return: The mapping function of the field.
+        """
+        return self.__func
+
+    @property
+    def blank(self):
+        """
+        Indicates if the value is allowed to be blank.
+
+        :return: Boolean indicating if the value is allowed to be blank.
+        """
+        return self.__blank
+
+    @property
+    def null(self):
+        """
+        Indicates if the value is allowed to be null.
+
+        :return: Boolean indicating if the value is allowed to be null.
+        """
+        return self.__null
+
+    @property
+    def depends(self):
+        """
+        Returns the names of the fields the value depends on, if declared.
+
+        :return: A tuple of field names or ``None``.
+        """
+        return self.__depends
+
+    def rename(self, name):
+        """
+        Renames the field.
+
+        :param name: The new name of the field.
+        """
+        self.__name = name
+
+    def treat_value(self, value):
+        """
+        Treats the value and return.
+
+        :param value: The value to be treated.
+        :return: A Value instance.
+        """
+        ## By now we have a value. If it is an instance of Value
+        ## class, return it as is:
+        if isinstance(value, Value):
+            return value
+
+        ## If the value is string and empty, but is not allowed to be so, return
+        ## with error:
+        if not self.blank and isinstance(value, str) and value == "":
+            return Value.error(value="", message="Value is not allowed to be blank.")
+
+        ## If the value is None but is not allowed to be so, return
+        ## with error:
+        if not self.null and value is None:
+            return Value.error(message="Value is not allowed to be None.")
+
+        ## OK, we have a value to be boxed and returned successfully:
+        return Value.success(value=value)
+
+    def _treatment(self):
+        """
+        Returns a value treatment function equivalent to :meth:`treat_value` with the blank and null checks
+        decided once.
+
+        :return: A function accepting a raw value and returning a Value instance.
+        """
+        ## If the treatment is customized, we can not specialize it:
+        if type(self).treat_value != Field.treat_value:
+            return self.treat_value
+
+        ## Get the flags and the constructors once:
+        blank, null, success, error = self.blank, self.null, Value.success, Value.error
+
+        ## Most fields accept both blank and null values, box them as they are:
+        if blank and null:
+            return lambda value: value if isinstance(value, Value) else success(value=value)
+
+        ## Otherwise, check what we have to:
+        def treat(value):
+            if isinstance(value, Value):
+                return value
+            if not blank and isinstance(value, str) and value == "":
+                return error(value="", message="Value is not allowed to be blank.")
+            if not null and value is None:
+                return error(message="Value is not allowed to be None.")
+            return success(value=value)
+
+        ## Done, return the treatment function:
+        return treat
+
+    def compile_column(self, positions=None):
+        """
+        Compiles the field into a function mapping a list of raw records at once, if the field can be mapped so.
+
+        :param positions: The column indices by keys if raw records are positional rows.
+        :return: ``None`` as generic fields can only be mapped record by record.
+        """
+        return None
+
+    def compile(self, positions=None, profile=None):
+        """
+        Compiles the field into a mapping function with the dispatch on the function decided once.
+
+        The returned function has the same signature and semantics as :meth:`map`. If :meth:`map` is
+        overridden by a subclass, the bound :meth:`map` method is returned as is.
+
+        If a ``profile`` is given, the returned function times the function and the treatment of the value
+        separately and adds the timings to the profile. Overridden :meth:`map` methods are timed as a whole.
+
+        :param positions: The column indices by keys if raw records are positional rows (see :class:`KeyField`).
+        :param profile: The :class:`FieldProfile` instance to add timings to, if any.
+        :return: A function accepting the instance and the raw record, returning a Value instance.
+
+        >>> mapper = Field(func=lambda i, r: r.get("a", None), null=False).compile()
+        >>> mapper(None, dict(a=1)).value
+        1
+        >>> mapper(None, dict()).status == Value.Status.Error
+        True
+        """
+        ## If the mapping is customized, we can not specialize it:
+        if type(self).map != Field.map:
+            return self.map if profile is None else _profiled(profile, self.map)
+
+        ## Get the treatment and the function:
+        treat, func = self._treatment(), self.func
+
+        ## Asynchronous functions can not be called synchronously:
+        if _iscoroutinefunction(func):
+            return self._synchronous()
+
+        ## If profiling, time the function and the treatment separately:
+        if profile is not None:
+            if func is None:
+                return _profiled(profile, lambda instance, record: None, treat=treat)
+            elif hasattr(func, "__call__"):
+                return _profiled(profile, func, treat=treat)
+            return _profiled(profile, lambda instance, record: getattr(instance, func)(record), treat=treat)
+
+        ## Decide on the function and return the mapper:
+        if func is None:
+            return lambda instance, record: treat(None)
+        elif hasattr(func, "__call__"):
+            return lambda instance, record: treat(func(instance, record))
+        else:
+            return lambda instance, record: treat(getattr(instance, func)(record))
+
+    def _synchronous(self):
+        """
+        Returns a mapper for fields with asynchronous functions which refuses to map synchronously.
+
+        :return: A function accepting the instance and the raw record, raising :class:`TypeError`.
+        """
+        def refuse(instance, record):
+            raise TypeError("Field '{}' has an asynchronous function, map records with Record.amap.".format(self.name))
+
+        return refuse
+
+    def acompile(self, positions=None):
+        """
+        Compiles the field into the stages of an asynchronous mapping if the field has an asynchronous function
+        (coroutine function), ie. a function starting the mapping and returning an awaitable, and a function
+        accepting the result of the awaitable and returning a Value instance.
+
+        :param positions: The column indices by keys if raw records are positional rows (see :class:`KeyField`).
+        :return: A tuple of the starting and finishing functions or ``None`` if the field is not asynchronous.
+        """
+        ## Check if the field is asynchronous:
+        func = self.func
+        if type(self).map != Field.map or not _iscoroutinefunction(func):
+            return None
+
+        ## Done, return the stages:
+        return func, self._treatment()
+
+    def map(self, instance, record):
+        """
+        Returns the value of for field as a Value instance.
+
+        :param instance: The instance for which the value will be retrieved.
+        :param record: The raw record.
+        :return: A Value instance.
+        """
+        ## Check if we have a function:
+        if self.func is None:
+            ## OK, value shall be None:
+            value = None
+        ## Check if the function is a callable or the name of an attribute of the instance:
+        elif hasattr(self.func, "__call__"):
+            ## The function is a callable. Call it directly on the
+            ## instance and the record and get the raw value:
+            value = self.func(instance, record)
+        else:
+            ## The function is not a callable. We assume that it is
+            ## the name of a method of the instance. Apply the
+            ## instance method on the record and get the raw value:
+            value = getattr(instance, self.func)(record)
+
+        ## Treat the value and return:
+        return self.treat_value(value)
+
+
+class KeyField(Field):
+    """
+    Provides a mapper field for a given key which belongs to the
+    record. The record can be an object which has `__getitem__` method
+    or a simple object just with attribute access.
+
+    The method starts reading the source value using the key provided
+    checking `__getitem__` method (for iterables such as `dict` or
+    `list`), then checks the attribute for simple object attribute
+    access.
+
+    >>> field = KeyField(key="a")
+    >>> field.map(None, dict(a="")).value
+    ''
+    >>> field.map(None, dict(a="")).status == Value.Status.Success
+    True
+    >>> field = KeyField(key="a", blank=False)
+    >>> field.map(None, dict(a="")).value
+    ''
+    >>> field.map(None, dict(a="")).status == Value.Status.Error
+    True
+    >>> field = KeyField(key="a", func=lambda i, r, v: as_number(v))
+    >>> field.map(None, dict(a="12")).value
+    Decimal('12')
+    >>> field.map(None, dict(a="12")).status == Value.Status.Success
+    True
+    >>> field = KeyField(key="a", cast=as_number)
+    >>> field.map(None, dict(a="12")).value
+    Decimal('12')
+    >>> field.map(None, dict(a="12")).status == Value.Status.Success
+    True
+    >>> field = KeyField(key="a", cast=as_date, cache=LRU(100))
+    >>> [field.map(None, dict(a="2015-01-01")).value for _ in range(3)]
+    [datetime.date(2015, 1, 1), datetime.date(2015, 1, 1), datetime.date(2015, 1, 1)]
+    >>> (field.cache.hits, field.cache.misses)
+    (2, 1)
+    >>> KeyField(key="a", cache=LRU(100))
+    Traceback (most recent call last):
+    ...
+    ValueError: Key fields require a cast to be cached.
+    >>> class Student:
+    ...     def __init__(self, name):
+    ...         self.name = name
+    >>> field = KeyField(key="name")
+    >>> field.map(None, Student("Sinan")).value
+    'Sinan'
+    """
+
+    def __init__(self, key=None, cast=None, cache=None, **kwargs):
+        """
+        Constructs a mapper field with the given argument.
+
+        :param key: The key of the property of the record to be mapped.
+        :param cast: The function to be applied to the value.
+        :param cache: The :class:`LRU` instance to memoize the cast with, if required (see :func:`cached`).
+        :param **kwargs: Keyword arguments to `Field`.
+        """
+        ## Only the cast is memoized, functions may depend on the record instance:
+        if cache is not None and cast is None:
+            raise ValueError("Key fields require a cast to be cached.")
+
+        super(KeyField, self).__init__(**kwargs)
+        self.__key = key
+        self.__cast = cast if cast is None or cache is None else cached(cast, cache)
+        self.__cache = cache
+
+    @property
+    def key(self):
+        """
+        Returns the key of for the field mapping.
+        """
+        return self.__key
+
+    @property
+    def cast(self):
+        """
+        Returns the function to be applied to the value, if any.
+        """
+        return self.__cast
+
+    @property
+    def cache(self):
+        """
+        Returns the :class:`LRU` instance the cast is memoized with, if any.
+        """
+        return self.__cache
+
+    def rename(self, name):
+        """
+        Renames the field.
+
+        :param name: The new name of the field.
+        """
+        ## Call the super:
+        super(KeyField, self).rename(name)
+
+        ## If the key is None, set it with joy:
+        if self.__key is None:
+            self.__key = name
+
+    def _accessor(self, positions=None):
+        """
+        Returns a function which reads the raw value for the key from a raw record as in :meth:`map`, or from a
+        positional row by the column index of the key if ``positions`` is given.
+
+        :param positions: The column indices by keys if raw records are positional rows.
+        :return: A function accepting the raw record and returning the raw value.
+        """
+        key = self.key
+
+        ## Positional rows are read by the column index, short rows and keys not in the header read as None:
+        if positions is not None:
+            position = positions.get(key)
+            if position is None:
+                return lambda record: None
+
+            def access_position(record):
+                try:
+                    return record[position]
+                except IndexError:
+                    return None
+
+            return access_position
+
+        def access(record):
+            ## Plain dictionaries are the most common records, look them up directly:
+            if type(record) is dict:
+                value = record.get(key, _MISSING)
+                return getattr(record, key, None) if value is _MISSING else value
+
+            ## Otherwise, proceed as in `map`:
+            if hasattr(record, "__getitem__") and key in record:
+                return record.get(key)
+            return getattr(record, key, None)
+
+        return access
+
+    def compile_column(self, positions=None):
+        """
+        Compiles the field into a function mapping a list of raw records at once using the vectorized version of
+        the cast, if the field can be mapped so.
+
+        The field can be mapped column-wise only if it has no function, its cast has a vectorized version (see
+        :func:`as_number_column` and friends) and neither :meth:`map` nor :meth:`treat_value` is overridden.
+
+        The returned function accepts a list of raw records and returns a tuple of the :class:`CastColumn`, the
+        status array and the list of ``(row index, message)`` tuples.
+
+        :param positions: The column indices by keys if raw records are positional rows.
+        :return: A function or ``None`` if the field can not be mapped column-wise.
+        """
+        ## Get the vectorized cast:
+        column_cast = _vectorized(self.__cast)
+
+        ## Check if we can map column-wise at all:
+        if column_cast is None or self.func is not None:
+            return None
+        if type(self).map != KeyField.map or type(self).treat_value != Field.treat_value:
+            return None
+
+        ## Get the accessor and the flags:
+        access, blank, null = self._accessor(positions), self.blank, self.null
+
+        def map_column(records):
+            ## Cast the column of raw values:
+            column = column_cast([access(record) for record in records])
+
+            ## Assume success, then mark blank and null values if they are not allowed:
+            statuses = array.array("B", [Value.Status.Success]) * len(records)
+            messages = []
+            for allowed, mask, message in ((blank, column.blank, "Value is not allowed to be blank."),
+                                           (null, column.null, "Value is not allowed to be None.")):
+                if not allowed:
+                    for index in mask.nonzero()[0]:
+                        statuses[index] = Value.Status.Error
+                        messages.append((int(index), message))
+
+            ## Done, return:
+            return column, statuses, messages
+
+        return map_column
+
+    def compile(self, positions=None, profile=None):
+        """
+        Compiles the field into a mapping function with the dispatch on the function and the cast decided once.
+
+        The returned function has the same signature and semantics as :meth:`map`. If :meth:`map` is
+        overridden by a subclass, the bound :meth:`map` method is returned as is.
+
+        If ``positions`` is given, raw records are positional rows, such as tuples read by ``csv.reader``,
+        and the raw value is read by the column index of the key without any membership test.
+
+        If a ``profile`` is given, the returned function times reading the raw value along with the function, the
+        cast and the treatment of the value separately (see :meth:`Field.compile`).
+
+        :param positions: The column indices by keys if raw records are positional rows.
+        :param profile: The :class:`FieldProfile` instance to add timings to, if any.
+        :return: A function accepting the instance and the raw record, returning a Value instance.
+
+        >>> mapper = KeyField(key="a", cast=as_number).compile()
+        >>> mapper(None, dict(a="12")).value
+        Decimal('12')
+        >>> mapper(None, dict()).value
+        >>> class Student:
+        ...     def __init__(self, name):
+        ...         self.name = name
+        >>> KeyField(key="name", func=lambda i, r, v: v.upper()).compile()(None, Student("Sinan")).value
+        'SINAN'
+        >>> mapper = KeyField(key="a", cast=as_number).compile(positions={"b": 0, "a": 1})
+        >>> mapper(None, ("x", "12")).value
+        Decimal('12')
+        >>> mapper(None, ("x",)).value
+        """
+        ## If the mapping is customized, we can not specialize it:
+        if type(self).map != KeyField.map:
+            return self.map if profile is None else _profiled(profile, self.map)
+
+        ## Get the treatment, accessor, function and cast:
+        treat, access, func, cast = self._treatment(), self._accessor(positions), self.func, self.__cast
+
+        ## Asynchronous functions can not be called synchronously:
+        if _iscoroutinefunction(func):
+            return self._synchronous()
+
+        ## Decide on the function:
+        if func is None:
+            fetch = lambda instance, record: access(record)
+        elif hasattr(func, "__call__"):
+            fetch = lambda instance, record: func(instance, record, access(record))
+        else:
+            fetch = lambda instance, record: getattr(instance, func)(record, access(record))
+
+        ## If profiling, time the stages separately:
+        if profile is not None:
+            return _profiled(profile, fetch, cast, treat)
+
+        ## If we don't have a cast, we are done:
+        if cast is None:
+            return lambda instance, record: treat(fetch(instance, record))
+
+        ## Check if the cast guards null or blank values, which can be treated once for all (unless the treatment
+        ## is customized):
+        guards, core = _fusion(cast)
+        if not guards or type(self).treat_value != Field.treat_value:
+            ## Nope, cast before treating the value:
+            def mapper(instance, record):
+                value = fetch(instance, record)
+                if isinstance(value, Value):
+                    return treat(Value(value=cast(value.value), status=value.status, message=value.message))
+                return treat(cast(value))
+
+            ## Done, return the mapper:
+            return mapper
+
+        ## Treat the guarded values once and apply the unguarded cast to the others:
+        null = treat(None) if "null" in guards else None
+        blank = treat("") if "blank" in guards else None
+
+        def guarded_mapper(instance, record):
+            value = fetch(instance, record)
+            if value is None:
+                return treat(cast(value)) if null is None else null
+            elif value == "":
+                return treat(cast(value)) if blank is None else blank
+            elif isinstance(value, Value):
+                return treat(Value(value=cast(value.value), status=value.status, message=value.message))
+            return treat(core(value))
+
+        ## Done, return the mapper:
+        return guarded_mapper
+
+    def acompile(self, positions=None):
+        """
+        Compiles the field into the stages of an asynchronous mapping if the field has an asynchronous function,
+        casting the result of the function before treating it (see :meth:`Field.acompile`).
+
+        :param positions: The column indices by keys if raw records are positional rows.
+        :return: A tuple of the starting and finishing functions or ``None`` if the field is not asynchronous.
+        """
+        ## Check if the field is asynchronous:
+        func = self.func
+        if type(self).map != KeyField.map or not _iscoroutinefunction(func):
+            return None
+
+        ## Get the treatment, accessor and cast:
+        treat, access, cast = self._treatment(), self._accessor(positions), self.__cast
+
+        def start(instance, record):
+            return func(instance, record, access(record))
+
+        def finish(value):
+            if cast is not None:
+                if isinstance(value, Value):
+                    value = Value(value=cast(value.value), status=value.status, message=value.message)
+                else:
+                    value = cast(value)
+            return treat(value)
+
+        ## Done, return the stages:
+        return start, finish
+
+    def map(self, instance, record):
+        """
+        Returns the value of for field as a Value instance.
+
+        :param instance: The instance for which the value will be retrieved.
+        :param record: The raw record.
+        :return: A Value instance.
+        """
+        ## Does the record have __getitem__ method (Indexable) and key exist?
+        if hasattr(record, "__getitem__") and self.key in record:
+            ## Yes, get the value:
+            value = record.get(self.key)
+        ## Nope, let's check if the record has such an attribute:
+        elif hasattr(record, self.key):
+            ## Yes, get the value using attribute access:
+            value = getattr(record, self.key)
+        ## We can't access such a value in the record.
+        else:
+            ## OK, Value shall be None:
+            value = None
+
+        ## Do we have a function:
+        if self.func is None:
+            ## Nope, skip:
+            pass
+        ## Check if the function is a callable or the name of an attribute of the instance:
+        elif hasattr(self.func, "__call__"):
+            ## The function is a callable. Call it directly on the
+            ## instance, the record and the raw value:
+            value = self.func(instance, record, value)
+        else:
+            ## The function is not a callable. We assume that it is
+            ## the name of a method on the instance. Apply the
+            ## instance method on the record and the raw value:
+            value = getattr(instance, self.func)(record, value)
+
+        ## OK, now we will cast if required:
+        if self.__cast is not None:
+            ## Is it a Value instance?
+            if isinstance(value, Value):
+                value = Value(value=self.__cast(value.value), status=value.status, message=value.message)
+            else:
+                value = self.__cast(value)
+
+        ## Done, treat the value and return:
+        return self.treat_value(value)
+
+
+class ChoiceKeyField(KeyField):
+    """
+    Defines a choice mapper for the index of the record provided.
+
+    >>> field = ChoiceKeyField(key="a", choices=dict(a=1, b=2))
+    >>> field.map(None, dict(a="a")).value
+    1
+    >>> field = ChoiceKeyField(key="a", choices=dict(a=1, b=2), func=lambda i, r, v: Decimal(str(v)))
+    >>> field.map(None, dict(a="a")).value
+    Decimal('1')
+    """
+
+    def __init__(self, *args, **kwargs):
+        ## Choices?
+        choices = kwargs.pop("choices", {})
+
+        ## Get the function:
+        functmp = kwargs.pop("func", None)
+
+        ## Compute the func (which does not depend on other fields unless a function is given):
+        if functmp is not None:
+            func = lambda i, r, v: functmp(i, r, choices.get(v, None))
+        else:
+            func = lambda i, r, v: choices.get(v, None)
+            kwargs.setdefault("depends", ())
+
+        ## Add the func back:
+        kwargs["func"] = func
+
+        ## OK, proceed as usual:
+        super(ChoiceKeyField, self).__init__(*args, **kwargs)
+
+
+class LookupField(KeyField):
+    """
+    Defines a lookup mapper for the key of the record provided, resolving the raw values with a ``resolver`` which
+    accepts a list of distinct raw values and returns a dictionary of raw values and resolved values. Raw values
+    which are ``None`` or not resolved are mapped to the ``default``.
+
+    When records are mapped in chunks (see :meth:`Record.map_many`), the raw values of the whole chunk are
+    resolved at once with a single call to the resolver (see :meth:`prefetch`). The resolved values are kept on the
+    records of the chunk while it is mapped, hence concurrent and nested runs do not share them. Otherwise, raw
+    values are resolved one at a time. Unhashable raw values are never resolved.
+
+    >>> calls = []
+    >>> def resolver(keys):
+    ...     calls.append(sorted(keys))
+    ...     return dict((key, key.upper()) for key in keys if key != "x")
+    >>> field = LookupField(key="a", resolver=resolver, default="?")
+    >>> field.map(None, dict(a="b")).value
+    'B'
+    >>> resolved = field.prefetch([dict(a="c"), dict(a="d"), dict(a="c"), dict(a="x"), dict(), dict(a=["y"])])
+    >>> [field.lookup(key, resolved) for key in ("c", "d", "x", None, ["y"])]
+    ['C', 'D', '?', '?', '?']
+    >>> calls
+    [['b'], ['c', 'd', 'x']]
+    >>> field = LookupField(key="a", resolver=resolver, func=lambda i, r, v: v + "!")
+    >>> field.map(None, dict(a="b")).value
+    'B!'
+
+    Records mapped in chunks resolve once per chunk:
+
+    >>> class TestRecord(Record):
+    ...     a = LookupField(resolver=resolver)
+    >>> del calls[:]
+    >>> [record.a for record in TestRecord.map_many([dict(a=key) for key in "abab"], chunk_size=3)]
+    ['A', 'B', 'A', 'B']
+    >>> calls
+    [['a', 'b'], ['b']]
+    >>> TestRecord(dict(a="a")).a
+    'A'
+    >>> calls
+    [['a', 'b'], ['b'], ['a']]
+
+    Nested runs prefetch their own chunks:
+
+    >>> class NestedRecord(Record):
+    ...     a = Field(func=lambda i, r: [record.b for record in NestedRecord.map_many(r.get("nested", []))])
+    ...     b = LookupField(resolver=resolver)
+    >>> del calls[:]
+    >>> [(record.a, record.b) for record in NestedRecord.map_many([dict(b="a", nested=[dict(b="b")])])]
+    [(['B'], 'A')]
+    >>> calls
+    [['a'], ['b']]
+    """
+
+    def __init__(self, *args, **kwargs):
+        ## Get the resolver and the default:
+        self.__resolver = kwargs.pop("resolver", None)
+        self.__default = kwargs.pop("default", None)
+        if self.__resolver is None:
+            raise TypeError("Lookup fields require a resolver.")
+
+        ## Get the function:
+        functmp = kwargs.pop("func", None)
+
+        ## Compute the func:
+        resolve = self._resolve
+        if functmp is not None:
+            func = lambda i, r, v: functmp(i, r, resolve(i, v))
+        else:
+            func = lambda i, r, v: resolve(i, v)
+            kwargs.setdefault("depends", ())
+
+        ## Add the func back:
+        kwargs["func"] = func
+
+        ## OK, proceed as usual:
+        super(LookupField, self).__init__(*args, **kwargs)
+
+    @property
+    def resolver(self):
+        """
+        Returns the resolver.
+        """
+        return self.__resolver
+
+    @property
+    def default(self):
+        """
+        Returns the value for raw values which are ``None`` or not resolved.
+        """
+        return self.__default
+
+    def lookup(self, key, resolved=None):
+        """
+        Returns the resolved value for the raw value, resolving it if it is not prefetched.
+
+        :param key: The raw value.
+        :param resolved: The resolved values prefetched by raw values, if any (see :meth:`prefetch`).
+        :return: The resolved value.
+        """
+        if key is None:
+            return self.__default
+        try:
+            return (resolved or _NO_LOOKUPS)[key]
+        except KeyError:
+            return self.__resolver([key]).get(key, self.__default)
+        except TypeError:
+            return self.__default
+
+    def _resolve(self, instance, key):
+        """
+        Returns the resolved value for the raw value, using the resolved values prefetched for the chunk of the
+        record instance, if any.
+
+        :param instance: The record instance.
+        :param key: The raw value.
+        :return: The resolved value.
+        """
+        lookups = getattr(instance, "_lookups", None)
+        return self.lookup(key, None if lookups is None else lookups.get(self))
+
+    def prefetch(self, records, positions=None):
+        """
+        Resolves the distinct raw values of the raw records with a single call to the resolver, skipping the
+        unhashable ones.
+
+        :param records: A list of raw records.
+        :param positions: The column indices by keys if raw records are positional rows.
+        :return: The dictionary of resolved values by raw values.
+        """
+        access, default = self._accessor(positions), self.__default
+        try:
+            keys = set(access(record) for record in records)
+        except TypeError:
+            keys = set()
+            for record in records:
+                try:
+                    keys.add(access(record))
+                except TypeError:
+                    pass
+        keys.discard(None)
+        resolved = self.__resolver(list(keys)) if keys else {}
+        return dict((key, resolved.get(key, default)) for key in keys)
+
+
+class FieldProfile(object):
+    """
+    Collects the number of evaluations of a field, the time spent in its function (including reading the raw value
+    and computing the fields accessed by the function), cast and treatment, and the distribution of the statuses of
+    its values.
+
+    Percentiles of the total time of evaluations and of the time spent in each stage are computed over a uniform
+    sample of evaluations.
+
+    >>> profile = FieldProfile("a")
+    >>> profile.add(Value.success(1), 0.5, 0.25, 0.25)
+    >>> profile.add(Value.error(message="Oops"), 1.0, 0.0, 0.0)
+    >>> (profile.calls, profile.func, profile.total, profile.percentile(50))
+    (2, 1.5, 2.0, 1.0)
+    >>> (profile.percentile(100, "func"), profile.percentile(100, "cast"), profile.percentile(50, "treat"))
+    (1.0, 0.25, 0.0)
+    >>> profile.statuses == {Value.Status.Success: 1, Value.Status.Error: 1}
+    True
+    """
+
+    def __init__(self, name, samples=1024, callback=None):
+        """
+        Constructs a field profile.
+
+        :param name: The name of the field.
+        :param samples: The maximum number of evaluation times to be sampled for percentiles.
+        :param callback: The function to be called with the name of the field, the value and the function, cast
+                         and treatment times on every evaluation, if any.
+        """
+        self.__name = name
+        self.__size = samples
+        self.__callback = callback
+        self.__calls = 0
+        self.__func = 0.0
+        self.__cast = 0.0
+        self.__treat = 0.0
+        self.__statuses = {}
+        self.__samples = OrderedDict((stage, array.array("d")) for stage in ("total", "func", "cast", "treat"))
+
+    @property
+    def name(self):
+        """
+        Returns the name of the field.
+        """
+        return self.__name
+
+    @property
+    def calls(self):
+        """
+        Returns the number of evaluations.
+        """
+        return self.__calls
+
+    @property
+    def func(self):
+        """
+        Returns the cumulative time spent in reading the raw value and the function.
+        """
+        return self.__func
+
+    @property
+    def cast(self):
+        """
+        Returns the cumulative time spent in the cast.
+        """
+        return self.__cast
+
+    @property
+    def treat(self):
+        """
+        Returns the cumulative time spent in the treatment of the value.
+        """
+        return self.__treat
+
+    @property
+    def total(self):
+        """
+        Returns the cumulative time spent in evaluations.
+        """
+        return self.__func + self.__cast + self.__treat
+
+    @property
+    def statuses(self):
+        """
+        Returns the number of values by status.
+        """
+        return dict(self.__statuses)
+
+    def add(self, value, func, cast, treat):
+        """
+        Adds an evaluation.
+
+        :param value: The resulting :class:`Value` instance.
+        :param func: The time spent in reading the raw value and the function.
+        :param cast: The time spent in the cast.
+        :param treat: The time spent in the treatment of the value.
+        """
+        ## Update the counters:
+        self.__calls += 1
+        self.__func += func
+        self.__cast += cast
+        self.__treat += treat
+        self.__statuses[value.status] = self.__statuses.get(value.status, 0) + 1
+
+        ## Sample the total time and the times of stages of the same evaluations (reservoir sampling):
+        samples = self.__samples
+        if len(samples["total"]) < self.__size:
+            samples["total"].append(func + cast + treat)
+            samples["func"].append(func)
+            samples["cast"].append(cast)
+            samples["treat"].append(treat)
+        else:
+            index = random.randrange(self.__calls)
+            if index < self.__size:
+                samples["total"][index] = func + cast + treat
+                samples["func"][index] = func
+                samples["cast"][index] = cast
+                samples["treat"][index] = treat
+
+        ## Call back, if required:
+        if self.__callback is not None:
+            self.__callback(self.__name, value, func, cast, treat)
+
+    def percentile(self, q, stage="total"):
+        """
+        Returns the percentile of the total time of evaluations or of the time spent in a stage, estimated over the
+        sample (nearest rank).
+
+        :param q: The percentile between ``0`` and ``100``.
+        :param stage: One of ``"total"``, ``"func"``, ``"cast"`` and ``"treat"``.
+        :return: The time, ``None`` if there was no evaluation.
+        """
+        if stage not in self.__samples:
+            raise ValueError("Unknown stage: {}".format(stage))
+        if not self.__samples[stage]:
+            return None
+        samples = sorted(self.__samples[stage])
+        return samples[min(len(samples) - 1, max(0, int(round(q / 100.0 * len(samples))) - 1))]
+
+    def as_dict(self):
+        """
+        Returns the counters, the timings and the percentiles of the total time of evaluations (``p50``, ``p90``
+        and ``p99``) and of the time spent in each stage (such as ``cast_p90``).
+
+        :return: An ordered dictionary.
+        """
+        return OrderedDict([("calls", self.__calls),
+                            ("func", self.__func),
+                            ("cast", self.__cast),
+                            ("treat", self.__treat),
+                            ("total", self.total)] +
+                           [("{}p{}".format("" if stage == "total" else stage + "_", q), self.percentile(q, stage))
+                            for stage in self.__samples for q in (50, 90, 99)] +
+                           [("success", self.__statuses.get(Value.Status.Success, 0)),
+                            ("warning", self.__statuses.get(Value.Status.Warning, 0)),
+                            ("error", self.__statuses.get(Value.Status.Error, 0))])
+
+
+class Profiler(object):
+    """
+    Profiles the fields of a record class while enabled.
+
+    Enabling the profiler recompiles the mappers of the record class with timing in between the stages of fields.
+    Disabling it restores the plain mappers, hence there is no overhead unless profiling. Records created while
+    the profiler is enabled are profiled, including the ones mapped in batches. Column-wise mapping (see
+    :meth:`Record.to_columns`) is not profiled.
+
+    >>> class TestRecord(Record):
+    ...     a = KeyField(cast=as_number, null=False)
+    ...     b = Field(func=lambda i, r: i.a)
+    >>> with Profiler(TestRecord) as profiler:
+    ...     records = list(TestRecord.map_many([dict(a="1"), dict()]))
+    >>> report = profiler.report()
+    >>> list(report)
+    ['a', 'b']
+    >>> (report["a"]["calls"], report["a"]["success"], report["a"]["error"])
+    (2, 1, 1)
+    >>> profiler["b"].calls
+    2
+    >>> profiler.enabled
+    False
+
+    Mappers compiled for the record class (see :meth:`Record.compile`) follow the profiler as well:
+
+    >>> map_one = TestRecord.compile(header=["a"])
+    >>> with Profiler(TestRecord) as profiler:
+    ...     _ = map_one(["1"])
+    >>> _ = map_one(["2"])
+    >>> profiler["a"].calls
+    1
+    """
+
+    def __init__(self, record_cls, callback=None, samples=1024):
+        """
+        Constructs a profiler.
+
+        :param record_cls: The record class to be profiled.
+        :param callback: The function to be called with the name of the field, the value and the function, cast
+                         and treatment times on every evaluation of a field, if any.
+        :param samples: The maximum number of evaluation times to be sampled per field for percentiles.
+        """
+        self.__record_cls = record_cls
+        self.__profiles = OrderedDict((name, FieldProfile(name, samples, callback)) for name in record_cls._names)
+
+    @property
+    def record_cls(self):
+        """
+        Returns the record class profiled.
+        """
+        return self.__record_cls
+
+    @property
+    def enabled(self):
+        """
+        Indicates if the profiler is enabled.
+        """
+        return self.__record_cls._profiler is self
+
+    def __getitem__(self, name):
+        """
+        Returns the profile of the field.
+
+        :param name: The name of the field.
+        :return: The :class:`FieldProfile` instance.
+        """
+        return self.__profiles[name]
+
+    def enable(self):
+        """
+        Enables the profiler.
+        """
+        record_cls = self.__record_cls
+        if record_cls._profiler is not None and record_cls._profiler is not self:
+            raise ValueError("Record class '{}' is being profiled already.".format(record_cls.__name__))
+        record_cls._profiler = self
+        record_cls._recompile()
+
+    def disable(self):
+        """
+        Disables the profiler.
+        """
+        record_cls = self.__record_cls
+        if record_cls._profiler is self:
+            record_cls._profiler = None
+            record_cls._recompile()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def report(self):
+        """
+        Returns the report of the profiles of fields (see :meth:`FieldProfile.as_dict`).
+
+        :return: An ordered dictionary of field names and profiles, in the order of the sorted field names.
+        """
+        return OrderedDict((name, profile.as_dict()) for name, profile in self.__profiles.items())
+
+
+class HyperLogLog(object):
+    """
+    Estimates the number of distinct items in constant memory (HyperLogLog with ``2 ** precision`` registers, with
+    a relative standard error of about ``1.04 / sqrt(2 ** precision)``).
+
+    Items are hashed by their representations with a stable hash function, hence estimators with the same precision
+    can be merged across processes.
+
+    >>> hll = HyperLogLog()
+    >>> for i in range(1000):
+    ...     hll.add(i % 100)
+    >>> 95 <= hll.count() <= 105
+    True
+    >>> other = HyperLogLog()
+    >>> for i in range(100, 200):
+    ...     other.add(i)
+    >>> 190 <= hll.merge(other).count() <= 210
+    True
+    """
+
+    def __init__(self, precision=12):
+        """
+        Constructs an estimator.
+
+        :param precision: The number of hash bits addressing the registers, between ``4`` and ``16``.
+        """
+        if not 4 <= precision <= 16:
+            raise ValueError("Precision must be between 4 and 16.")
+        self.__precision = precision
+        self.__registers = bytearray(1 << precision)
+
+    @property
+    def precision(self):
+        """
+        Returns the precision.
+        """
+        return self.__precision
+
+    def add(self, item):
+        """
+        Adds an item.
+
+        :param item: The item.
+        """
+        ## Hash the item to 64 bits, address the register with the first bits and rank the rest:
+        bits = 64 - self.__precision
+        digest = int(hashlib.sha1(repr(item).encode("utf-8")).hexdigest()[:16], 16)
+        index, rest = digest >> bits, digest & ((1 << bits) - 1)
+        rank = bits - rest.bit_length() + 1
+
+        ## Keep the maximum rank:
+        if rank > self.__registers[index]:
+            self.__registers[index] = rank
+
+    def count(self):
+        """
+        Returns the estimated number of distinct items.
+
+        :return: An integer.
+        """
+        registers = self.__registers
+        size = len(registers)
+        estimate = 0.7213 / (1 + 1.079 / size) * size * size / sum(2.0 ** -rank for rank in registers)
+
+        ## Use linear counting for small cardinalities:
+        zeros = registers.count(0)
+        if zeros and estimate <= 2.5 * size:
+            estimate = size * math.log(float(size) / zeros)
+
+        ## Done, return:
+        return int(round(estimate))
+
+    def merge(self, other):
+        """
+        Merges the other estimator into this one.
+
+        :param other: The other :class:`HyperLogLog` instance with the same precision.
+        :return: This estimator.
+        """
+        if other.precision != self.__precision:
+            raise ValueError("Can not merge estimators with different precisions.")
+        self.__registers = bytearray(max(a, b) for a, b in zip(self.__registers, other.__registers))
+        return self
+
+
+class TopK(object):
+    """
+    Tracks the most frequent items in constant memory (Space-Saving with up to ``2 * capacity`` counters).
+
+    When the counters overflow, only the ``capacity`` largest ones are kept, and items added afterwards inherit the
+    largest count dropped so far. Hence counts are exact while there are at most ``2 * capacity`` distinct items,
+    and overestimated by at most that count otherwise. Trackers can be merged by summing the counters and keeping
+    the largest ones.
+
+    >>> topk = TopK(capacity=3)
+    >>> for item in "aaaabbbcd":
+    ...     topk.add(item)
+    >>> topk.most_common(2)
+    [('a', 4), ('b', 3)]
+    >>> other = TopK(capacity=3)
+    >>> other.add("b", 2)
+    >>> topk.merge(other).most_common(1)
+    [('b', 5)]
     """
 
-    def __init__(self, name=None, func=None, blank=True, null=True):
+    def __init__(self, capacity=100):
         """
-        Constructs a mapper field with the given argument.
+        Constructs a tracker.
+
+        :param capacity: The maximum number of items tracked.
+        """
+        self.__capacity = capacity
+        self.__counts = {}
+        self.__floor = 0
+
+    @property
+    def capacity(self):
+        """
+        Returns the maximum number of items tracked.
+        """
+        return self.__capacity
+
+    def add(self, item, count=1):
+        """
+        Adds an item.
+
+        :param item: The hashable item.
+        :param count: The number of occurrences.
+        """
+        counts = self.__counts
+        if item in counts:
+            counts[item] += count
+        else:
+            counts[item] = self.__floor + count
+            if len(counts) > 2 * self.__capacity:
+                self.__prune()
+
+    def __prune(self):
+        """
+        Keeps the largest counters only, remembering the largest count dropped.
+        """
+        ranked = sorted(self.__counts.items(), key=lambda x: -x[1])
+        self.__floor = max(self.__floor, ranked[self.__capacity][1])
+        self.__counts = dict(ranked[:self.__capacity])
+
+    def most_common(self, k=None):
+        """
+        Returns the most frequent items and their (estimated) counts.
+
+        :param k: The number of items to be returned, all tracked items if ``None``.
+        :return: A list of ``(item, count)`` tuples in descending order of counts.
+        """
+        return sorted(self.__counts.items(), key=lambda x: (-x[1], repr(x[0])))[:k]
+
+    def merge(self, other):
+        """
+        Merges the other tracker into this one.
+
+        :param other: The other :class:`TopK` instance.
+        :return: This tracker.
+        """
+        counts = self.__counts
+        for item, count in other.__counts.items():
+            counts[item] = counts.get(item, 0) + count
+        self.__floor += other.__floor
+        if len(counts) > 2 * self.__capacity:
+            self.__prune()
+        return self
+
+
+class FieldSummary(object):
+    """
+    Summarizes the value slots of a field in constant memory: The number of values, ``None`` and blank values, values
+    by status, the minimum and maximum values, the approximate number of distinct values (see :class:`HyperLogLog`)
+    and the most frequent values and messages (see :class:`TopK`).
+
+    >>> summary = FieldSummary("a")
+    >>> for value in [Value.success(1), Value.success(3), Value.success(None), Value.error(message="Oops")]:
+    ...     summary.add(value)
+    >>> (summary.count, summary.none, summary.blank, summary.min, summary.max, summary.distinct)
+    (4, 2, 0, 1, 3, 3)
+    >>> summary.as_dict()["top_messages"]
+    [('Oops', 1)]
+    """
+
+    def __init__(self, name, k=10, precision=12):
+        """
+        Constructs a field summary.
 
         :param name: The name of the field.
-        :param func: The function which is to be used to map the value.
-        :param blank: Boolean indicating if blank values are allowed.
-        :param null: Boolean indicating if null values are allowed.
+        :param k: The number of most frequent values and messages to be reported.
+        :param precision: The precision of the distinct value estimator.
         """
         self.__name = name
-        self.__func = func
-        self.__blank = blank
-        self.__null = null
+        self.__k = k
+        self.__count = 0
+        self.__none = 0
+        self.__blank = 0
+        self.__statuses = {}
+        self.__min = None
+        self.__max = None
+        self.__distinct = HyperLogLog(precision)
+        self.__values = TopK(5 * k)
+        self.__messages = TopK(5 * k)
 
     @property
     def name(self):
         """
         Returns the name of the field.
-
-        :return: The name of the field.
         """
         return self.__name
 
     @property
-    def func(self):
+    def count(self):
         """
-        Returns the mapping function of the field.
+        Returns the number of values.
+        """
+        return self.__count
 
-        :return: The mapping function of the field.
+    @property
+    def none(self):
         """
-        return self.__func
+        Returns the number of ``None`` values.
+        """
+        return self.__none
 
     @property
     def blank(self):
         """
-        Indicates if the value is allowed to be blank.
-
-        :return: Boolean indicating if the value is allowed to be blank.
+        Returns the number of blank values.
         """
         return self.__blank
 
     @property
-    def null(self):
+    def statuses(self):
         """
-        Indicates if the value is allowed to be null.
-
-        :return: Boolean indicating if the value is allowed to be null.
+        Returns the number of values by status.
         """
-        return self.__null
+        return dict(self.__statuses)
 
-    def rename(self, name):
+    @property
+    def min(self):
         """
-        Renames the field.
-
-        :param name: The new name of the field.
+        Returns the minimum of the values other than ``None`` or blank, if they are comparable.
         """
-        self.__name = name
+        return self.__min
 
-    def treat_value(self, value):
+    @property
+    def max(self):
         """
-        Treats the value and return.
-
-        :param value: The value to be treated.
-        :return: A Value instance.
+        Returns the maximum of the values other than ``None`` or blank, if they are comparable.
         """
-        ## By now we have a value. If it is an instance of Value
-        ## class, return it as is:
-        if isinstance(value, Value):
-            return value
-
-        ## If the value is string and empty, but is not allowed to be so, return
-        ## with error:
-        if not self.blank and isinstance(value, str) and value == "":
-            return Value.error(value="", message="Value is not allowed to be blank.")
+        return self.__max
 
-        ## If the value is None but is not allowed to be so, return
-        ## with error:
-        if not self.null and value is None:
-            return Value.error(message="Value is not allowed to be None.")
+    @property
+    def distinct(self):
+        """
+        Returns the estimated number of distinct values (including ``None``).
+        """
+        return self.__distinct.count()
 
-        ## OK, we have a value to be boxed and returned successfully:
-        return Value.success(value=value)
+    def __extend(self, low, high):
+        """
+        Extends the range of values with the given bounds, ignoring the ones which are not comparable.
+        """
+        try:
+            if self.__min is None or low < self.__min:
+                self.__min = low
+            if self.__max is None or high > self.__max:
+                self.__max = high
+        except TypeError:
+            pass
 
-    def map(self, instance, record):
+    def add(self, value):
         """
-        Returns the value of for field as a Value instance.
+        Adds a value slot.
 
-        :param instance: The instance for which the value will be retrieved.
-        :param record: The raw record.
-        :return: A Value instance.
+        :param value: The :class:`Value` instance.
         """
-        ## Check if we have a function:
-        if self.func is None:
-            ## OK, value shall be None:
-            value = None
-        ## Check if the function is a callable or the name of an attribute of the instance:
-        elif hasattr(self.func, "__call__"):
-            ## The function is a callable. Call it directly on the
-            ## instance and the record and get the raw value:
-            value = self.func(instance, record)
+        ## Update the counters:
+        self.__count += 1
+        self.__statuses[value.status] = self.__statuses.get(value.status, 0) + 1
+        if value.message is not None:
+            self.__messages.add(value.message)
+
+        ## Update the range and the counters of values:
+        item = value.value
+        if item is None:
+            self.__none += 1
+        elif item == "":
+            self.__blank += 1
         else:
-            ## The function is not a callable. We assume that it is
-            ## the name of a method of the instance. Apply the
-            ## instance method on the record and get the raw value:
-            value = getattr(instance, self.func)(record)
-
-        ## Treat the value and return:
-        return self.treat_value(value)
+            self.__extend(item, item)
 
+        ## Update the distinct values and the most frequent values:
+        self.__distinct.add(item)
+        try:
+            self.__values.add(item)
+        except TypeError:
+            self.__values.add(repr(item))
 
-class KeyField(Field):
-    """
-    Provides a mapper field for a given key which belongs to the
-    record. The record can be an object which has `__getitem__` method
-    or a simple object just with attribute access.
+    def merge(self, other):
+        """
+        Merges the other summary into this one.
 
-    The method starts reading the source value using the key provided
-    checking `__getitem__` method (for iterables such as `dict` or
-    `list`), then checks the attribute for simple object attribute
-    access.
+        :param other: The other :class:`FieldSummary` instance.
+        :return: This summary.
+        """
+        self.__count += other.count
+        self.__none += other.none
+        self.__blank += other.blank
+        for status, count in other.statuses.items():
+            self.__statuses[status] = self.__statuses.get(status, 0) + count
+        if other.min is not None:
+            self.__extend(other.min, other.max)
+        self.__distinct.merge(other.__distinct)
+        self.__values.merge(other.__values)
+        self.__messages.merge(other.__messages)
+        return self
+
+    def as_dict(self):
+        """
+        Returns the counters, the range, the estimated number of distinct values and the most frequent values and
+        messages.
 
-    >>> field = KeyField(key="a")
-    >>> field.map(None, dict(a="")).value
-    ''
-    >>> field.map(None, dict(a="")).status == Value.Status.Success
-    True
-    >>> field = KeyField(key="a", blank=False)
-    >>> field.map(None, dict(a="")).value
-    ''
-    >>> field.map(None, dict(a="")).status == Value.Status.Error
-    True
-    >>> field = KeyField(key="a", func=lambda i, r, v: as_number(v))
-    >>> field.map(None, dict(a="12")).value
-    Decimal('12')
-    >>> field.map(None, dict(a="12")).status == Value.Status.Success
-    True
-    >>> field = KeyField(key="a", cast=as_number)
-    >>> field.map(None, dict(a="12")).value
-    Decimal('12')
-    >>> field.map(None, dict(a="12")).status == Value.Status.Success
-    True
-    >>> class Student:
-    ...     def __init__(self, name):
-    ...         self.name = name
-    >>> field = KeyField(key="name")
-    >>> field.map(None, Student("Sinan")).value
-    'Sinan'
+        :return: An ordered dictionary.
+        """
+        return OrderedDict([("count", self.__count),
+                            ("none", self.__none),
+                            ("blank", self.__blank),
+                            ("success", self.__statuses.get(Value.Status.Success, 0)),
+                            ("warning", self.__statuses.get(Value.Status.Warning, 0)),
+                            ("error", self.__statuses.get(Value.Status.Error, 0)),
+                            ("min", self.__min),
+                            ("max", self.__max),
+                            ("distinct", self.distinct),
+                            ("top_values", self.__values.most_common(self.__k)),
+                            ("top_messages", self.__messages.most_common(self.__k))])
+
+
+class QualityProfile(object):
+    """
+    Profiles the values of the fields of records of a record class in a single pass and constant memory (see
+    :class:`FieldSummary`).
+
+    Records are added one by one or observed while they are iterated over, for example as they are mapped by
+    :meth:`Record.map_many`. Profiles of the same fields are picklable and can be merged, hence partial profiles can
+    be built by worker processes and combined.
+
+    >>> class TestRecord(Record):
+    ...     a = KeyField(cast=as_number, null=False)
+    ...     b = KeyField(cast=as_factor)
+    >>> profile = QualityProfile(TestRecord)
+    >>> records = list(profile.observe(TestRecord.map_many([dict(a="1", b="x"), dict(a="3", b="x"), dict(b="")])))
+    >>> report = profile.report()
+    >>> list(report)
+    ['a', 'b']
+    >>> (report["a"]["count"], report["a"]["error"], report["a"]["min"], report["a"]["max"])
+    (3, 1, Decimal('1'), Decimal('3'))
+    >>> (report["b"]["blank"], report["b"]["top_values"][0])
+    (1, ('X', 2))
+    >>> other = QualityProfile(TestRecord, fields=["b", "a"])
+    >>> other.add(TestRecord(dict(a="5")))
+    >>> (profile.merge(other)["a"].max, profile.count)
+    (Decimal('5'), 4)
     """
 
-    def __init__(self, key=None, cast=None, **kwargs):
+    def __init__(self, record_cls, fields=None, k=10, precision=12):
         """
-        Constructs a mapper field with the given argument.
+        Constructs a quality profile.
 
-        :param key: The key of the property of the record to be mapped.
-        :param cast: The function to be applied to the value.
-        :param **kwargs: Keyword arguments to `Field`.
+        :param record_cls: The record class.
+        :param fields: The names of the fields to be profiled, all if ``None``.
+        :param k: The number of most frequent values and messages to be reported per field.
+        :param precision: The precision of the distinct value estimators.
         """
-        super(KeyField, self).__init__(**kwargs)
-        self.__key = key
-        self.__cast = cast
+        names = list(record_cls._names if fields is None else fields)
+        self.__indices = None if fields is None else record_cls._projection(names)
+        self.__count = 0
+        self.__summaries = OrderedDict((name, FieldSummary(name, k, precision)) for name in sorted(names))
+        self.__order = [self.__summaries[name] for name in names]
 
     @property
-    def key(self):
+    def count(self):
         """
-        Returns the key of for the field mapping.
+        Returns the number of records profiled.
         """
-        return self.__key
+        return self.__count
 
-    def rename(self, name):
+    def __getitem__(self, name):
         """
-        Renames the field.
+        Returns the summary of the field.
 
-        :param name: The new name of the field.
+        :param name: The name of the field.
+        :return: The :class:`FieldSummary` instance.
         """
-        ## Call the super:
-        super(KeyField, self).rename(name)
+        return self.__summaries[name]
 
-        ## If the key is None, set it with joy:
-        if self.__key is None:
-            self.__key = name
+    def add(self, record):
+        """
+        Adds a record.
 
-    def map(self, instance, record):
+        :param record: The record instance.
         """
-        Returns the value of for field as a Value instance.
+        self.__count += 1
+        for summary, value in zip(self.__order, record._computed(self.__indices)):
+            summary.add(value)
 
-        :param instance: The instance for which the value will be retrieved.
-        :param record: The raw record.
-        :return: A Value instance.
+    def observe(self, records):
         """
-        ## Does the record have __getitem__ method (Indexable) and key exist?
-        if hasattr(record, "__getitem__") and self.key in record:
-            ## Yes, get the value:
-            value = record.get(self.key)
-        ## Nope, let's check if the record has such an attribute:
-        elif hasattr(record, self.key):
-            ## Yes, get the value using attribute access:
-            value = getattr(record, self.key)
-        ## We can't access such a value in the record.
-        else:
-            ## OK, Value shall be None:
-            value = None
+        Adds the records as they are iterated over.
 
-        ## Do we have a function:
-        if self.func is None:
-            ## Nope, skip:
-            pass
-        ## Check if the function is a callable or the name of an attribute of the instance:
-        elif hasattr(self.func, "__call__"):
-            ## The function is a callable. Call it directly on the
-            ## instance, the record and the raw value:
-            value = self.func(instance, record, value)
+        :param records: An iterable of record instances.
+        :return: A generator of the records.
+        """
+        add = self.add
+        for record in records:
+            add(record)
+            yield record
+
+    def merge(self, other):
+        """
+        Merges the other profile into this one.
+
+        :param other: The other :class:`QualityProfile` instance of the same fields.
+        :return: This profile.
+        """
+        if set(self.__summaries) != set(other.__summaries):
+            raise ValueError("Can not merge profiles of different fields.")
+        self.__count += other.count
+        for name, summary in self.__summaries.items():
+            summary.merge(other[name])
+        return self
+
+    def report(self):
+        """
+        Returns the report of the summaries of fields (see :meth:`FieldSummary.as_dict`).
+
+        :return: An ordered dictionary of field names and summaries, in the order of the sorted field names.
+        """
+        return OrderedDict((name, summary.as_dict()) for name, summary in self.__summaries.items())
+
+
+def _tracer(record_cls, index, mapper):
+    """
+    Wraps the mapper of a field without declared dependencies to trace the value slots it accesses on every
+    evaluation, and merges them into the dependencies of the field.
+
+    The value slots accessed may differ from one evaluation to another, for example if the function accesses fields
+    conditionally. Merging them keeps the dependencies a superset of the value slots accessed by any value computed
+    so far, hence changing a value slot invalidates the values computed from it.
+
+    Frames of fields being traced are kept on the record instance as ``(value slot index, accessed value slot
+    indices, parent frame)`` tuples.
+
+    :param record_cls: The record class.
+    :param index: The value slot index of the field.
+    :param mapper: The compiled mapper of the field.
+    :return: The tracing mapper.
+    """
+    def trace(instance, record):
+        ## Are we tracing the same field for the same instance already?
+        parent = frame = instance._trace
+        while frame is not None:
+            if frame[0] == index:
+                path, frame = [index], parent
+                while frame[0] != index:
+                    path.append(frame[0])
+                    frame = frame[2]
+                path.append(index)
+                raise ValueError("Circular field dependencies: {}".format(
+                    " -> ".join(record_cls._names[i] for i in reversed(path))))
+            frame = frame[2]
+
+        ## Map while tracing:
+        accessed = set()
+        instance._trace = (index, accessed, parent)
+        try:
+            value = mapper(instance, record)
+        finally:
+            instance._trace = parent
+
+        ## Merge the accessed value slots into the dependencies, if any is new:
+        known = record_cls._dependencies[index]
+        if known is None or not accessed <= known:
+            record_cls._dependencies[index] = frozenset(accessed) if known is None else known | accessed
+            record_cls._dependents = None
+
+        ## Done, return the value:
+        return value
+
+    return trace
+
+
+def _find_cycle(dependencies):
+    """
+    Finds a cycle in the dependency graph.
+
+    :param dependencies: The list of sets of dependencies by node, ``None`` for unknown dependencies.
+    :return: The list of nodes on the cycle, starting and ending with the same node, or ``None``.
+
+    >>> _find_cycle([frozenset([1]), frozenset([2]), None])
+    >>> _find_cycle([frozenset([1]), frozenset([2]), frozenset([0])])
+    [0, 1, 2, 0]
+    """
+    ## Keep the state of nodes (visiting or visited) and the path being visited:
+    state, path = {}, []
+
+    def visit(node):
+        state[node] = "visiting"
+        path.append(node)
+        for dependency in sorted(dependencies[node] or ()):
+            if state.get(dependency) == "visiting":
+                return path[path.index(dependency):] + [dependency]
+            elif dependency not in state:
+                cycle = visit(dependency)
+                if cycle:
+                    return cycle
+        state[node] = "visited"
+        path.pop()
+
+    for node in range(len(dependencies)):
+        if node not in state:
+            cycle = visit(node)
+            if cycle:
+                return cycle
+
+
+def _event_loop():
+    """
+    Returns the running event loop.
+
+    :return: The event loop.
+    """
+    import asyncio
+    return getattr(asyncio, "get_running_loop", asyncio.get_event_loop)()
+
+
+def _chain(source, target):
+    """
+    Completes the target future with the outcome of the source future when it is done.
+
+    :param source: The source future.
+    :param target: The target future.
+    """
+    def copy_outcome(future):
+        if target.done():
+            return
+        elif future.cancelled():
+            target.cancel()
+        elif future.exception() is not None:
+            target.set_exception(future.exception())
         else:
-            ## The function is not a callable. We assume that it is
-            ## the name of a method on the instance. Apply the
-            ## instance method on the record and the raw value:
-            value = getattr(instance, self.func)(record, value)
+            target.set_result(future.result())
 
-        ## OK, now we will cast if required:
-        if self.__cast is not None:
-            ## Is it a Value instance?
-            if isinstance(value, Value):
-                value = Value(value=self.__cast(value.value), status=value.status, message=value.message)
-            else:
-                value = self.__cast(value)
+    source.add_done_callback(copy_outcome)
 
-        ## Done, treat the value and return:
-        return self.treat_value(value)
 
+class _AsyncMapping(object):
+    """
+    Provides an asynchronous iterator over the records mapped from a synchronous or an asynchronous iterable of raw
+    records (see :meth:`Record.amap_many`).
 
-class ChoiceKeyField(KeyField):
+    Raw records are pulled from the source only while fewer than ``concurrency`` records are being mapped or waiting
+    to be consumed, and records are yielded in input order. Consumers stopping early shall close the iterator (see
+    :meth:`aclose`), or use it as an asynchronous context manager, to cancel the records being mapped.
     """
-    Defines a choice mapper for the index of the record provided.
 
-    >>> field = ChoiceKeyField(key="a", choices=dict(a=1, b=2))
-    >>> field.map(None, dict(a="a")).value
-    1
-    >>> field = ChoiceKeyField(key="a", choices=dict(a=1, b=2), func=lambda i, r, v: Decimal(str(v)))
-    >>> field.map(None, dict(a="a")).value
-    Decimal('1')
-    """
+    def __init__(self, record_cls, records, concurrency, header):
+        """
+        Constructs the asynchronous iterator.
+
+        :param record_cls: The record class.
+        :param records: An iterable or an asynchronous iterable of raw records.
+        :param concurrency: The maximum number of records in flight.
+        :param header: The header if raw records are positional rows, ``True`` to read it from the first row.
+        """
+        self.__record_cls = record_cls
+        self.__asynchronous = hasattr(records, "__aiter__")
+        self.__source = records.__aiter__() if self.__asynchronous else iter(records)
+        self.__concurrency = concurrency
+        self.__header = header if header is None or header is True else tuple(header)
+        self.__inflight = collections.deque()
+        self.__waiters = collections.deque()
+        self.__pulling = False
+        self.__pull = None
+        self.__exhausted = False
+
+    def __aiter__(self):
+        return self
+
+    def __aenter__(self):
+        entered = _event_loop().create_future()
+        entered.set_result(self)
+        return entered
+
+    def __aexit__(self, exc_type, exc_value, traceback):
+        return self.aclose()
+
+    def aclose(self):
+        """
+        Stops pulling raw records and cancels the records being mapped.
+
+        :return: An awaitable future completed once the asynchronous fields being computed are cancelled.
+        """
+        import asyncio
+
+        ## Stop pulling:
+        self.__exhausted = True
+        if self.__pull is not None:
+            self.__pull.cancel()
+
+        ## Cancel the records being mapped, retrieving the errors of the failed ones so that they are not reported:
+        tasks = []
+        while self.__inflight:
+            future, running = self.__inflight.popleft()
+            tasks.extend(running.values())
+            if not future.cancel() and not future.cancelled():
+                future.exception()
+
+        ## Cancel the waiting consumers, if any:
+        while self.__waiters:
+            self.__waiters.popleft().cancel()
+
+        ## Done, return the future of the cancelled asynchronous fields:
+        return asyncio.gather(*tasks, return_exceptions=True)
+
+    def __anext__(self):
+        ## Create the future for the next record and serve:
+        waiter = _event_loop().create_future()
+        self.__waiters.append(waiter)
+        self.__serve()
+        return waiter
+
+    def __serve(self):
+        """
+        Pulls raw records as permitted and completes the waiting futures in order as records are mapped.
+        """
+        self.__fill()
+        while self.__waiters:
+            if self.__inflight:
+                _chain(self.__inflight.popleft()[0], self.__waiters.popleft())
+                self.__fill()
+            elif self.__exhausted and not self.__pulling:
+                self.__waiters.popleft().set_exception(StopAsyncIteration())
+            else:
+                break
+
+    def __fill(self):
+        """
+        Pulls raw records from the source and starts mapping them while the window is not full.
+        """
+        while not self.__exhausted and not self.__pulling and len(self.__inflight) < self.__concurrency:
+            ## Asynchronous sources are pulled one raw record at a time:
+            if self.__asynchronous:
+                import asyncio
+                self.__pulling = True
+                self.__pull = asyncio.ensure_future(self.__source.__anext__())
+                self.__pull.add_done_callback(self.__pulled)
+                return
+
+            ## Synchronous sources are pulled right away:
+            try:
+                raw = next(self.__source)
+            except StopIteration:
+                self.__exhausted = True
+            else:
+                self.__push(raw)
+
+    def __pulled(self, pull):
+        """
+        Starts mapping the raw record pulled from the asynchronous source, if any, and serves.
 
-    def __init__(self, *args, **kwargs):
-        ## Choices?
-        choices = kwargs.pop("choices", {})
+        :param pull: The future of the raw record.
+        """
+        self.__pulling, self.__pull = False, None
+        if pull.cancelled() or isinstance(pull.exception(), StopAsyncIteration):
+            self.__exhausted = True
+        elif pull.exception() is not None:
+            ## Pass the error to the consumer in order and stop:
+            self.__exhausted = True
+            failed = _event_loop().create_future()
+            failed.set_exception(pull.exception())
+            self.__inflight.append((failed, {}))
+        else:
+            self.__push(pull.result())
+        self.__serve()
 
-        ## Get the function:
-        functmp = kwargs.pop("func", None)
+    def __push(self, raw):
+        """
+        Starts mapping the raw record, or takes it as the header if required.
 
-        ## Compute the func
-        if functmp is not None:
-            func = lambda i, r, v: functmp(i, r, choices.get(v, None))
+        :param raw: The raw record.
+        """
+        if self.__header is True:
+            self.__header = tuple(raw)
         else:
-            func = lambda i, r, v: choices.get(v, None)
+            self.__inflight.append(self.__record_cls._amap(raw, self.__header))
 
-        ## Add the func back:
-        kwargs["func"] = func
 
-        ## OK, proceed as usual:
-        super(ChoiceKeyField, self).__init__(*args, **kwargs)
+def _getattr_through_getval(self, item):
+    """
+    Returns the value of the attribute named `item` through :meth:`Record.getval`, for the record classes which
+    override it.
+
+    :param item: The name of the attribute, in particular the field name.
+    :return: The value (value attribute of the Value).
+    """
+    return self.getval(item).value
 
 
 class RecordMetaclass(type):
@@ -641,19 +3477,79 @@ class RecordMetaclass(type):
         fields = dict([(key, attrs.pop(key)) for key in list(attrs.keys()) if isinstance(attrs.get(key), Field)])
 
         ## Check fields and make sure that names are added:
-        for name, field in fields.items():
+        for key, field in fields.items():
             if field.name is None:
-                field.rename(name)
+                field.rename(key)
 
         ## Get the record class as usual:
         record_cls = super(RecordMetaclass, mcs).__new__(mcs, name, bases, attrs, **kwargs)
 
+        ## Attribute access and exports inline `getval`, route them through `getval` if it is overridden (attribute
+        ## access only if it is not overridden itself):
+        base = globals().get("Record")
+        record_cls._overrides_getval = base is not None and \
+            get_unbound_function(record_cls.getval) is not get_unbound_function(base.getval)
+        if record_cls._overrides_getval and \
+                get_unbound_function(record_cls.__getattr__) is get_unbound_function(base.__getattr__):
+            record_cls.__getattr__ = _getattr_through_getval
+
         ## Attach fields to the class:
         record_cls._fields = {}
 
         ## Now, process the fields:
         record_cls._fields.update(fields)
 
+        ## Assign value slot indices to fields in the order of their sorted names:
+        record_cls._names = tuple(sorted(fields))
+        record_cls._indices = dict((name, index) for index, name in enumerate(record_cls._names))
+
+        ## Build the dependency graph, undeclared dependencies of fields are traced on evaluation:
+        record_cls._dependencies = []
+        for name in record_cls._names:
+            field = fields[name]
+            if field.depends is not None:
+                unknown = [dependency for dependency in field.depends if dependency not in record_cls._indices]
+                if unknown:
+                    raise ValueError("Field '{}' depends on unknown field(s): {}".format(name, ", ".join(unknown)))
+                record_cls._dependencies.append(frozenset(record_cls._indices[key] for key in field.depends))
+            elif field.func is None and type(field).map in (Field.map, KeyField.map):
+                record_cls._dependencies.append(frozenset())
+            else:
+                record_cls._dependencies.append(None)
+        record_cls._traced = frozenset(index for index, dependencies in enumerate(record_cls._dependencies)
+                                       if dependencies is None)
+        record_cls._asynchronous = frozenset(index for index, name in enumerate(record_cls._names)
+                                             if _iscoroutinefunction(fields[name].func))
+
+        ## Check for circular dependencies:
+        cycle = _find_cycle(record_cls._dependencies)
+        if cycle:
+            raise ValueError("Circular field dependencies: {}".format(" -> ".join(record_cls._names[i] for i in cycle)))
+
+        ## Reset the dependents of value slots, computed on demand:
+        record_cls._dependents = None
+
+        ## The record class is not being profiled:
+        record_cls._profiler = None
+
+        ## Compile the mappers of the fields once for all records of the class, in the order of value slots:
+        record_cls._mappers = record_cls._compile_mappers()
+
+        ## Mappers for positional rows are compiled once per header:
+        record_cls._headers = {}
+
+        ## Reset the compiled record mapper, if any:
+        record_cls._map_one = None
+
+        ## Stages of asynchronous fields are compiled once per header on first use:
+        record_cls._astages = {}
+
+        ## Fingerprinters of raw records for the row cache are compiled once per header on first use:
+        record_cls._fingerprinters = {}
+
+        ## Get the fields resolving raw values for chunks of raw records at once (see `LookupField`):
+        record_cls._prefetchers = tuple(fields[name] for name in record_cls._names if hasattr(fields[name], "prefetch"))
+
         ## Done, return the record class:
         return record_cls
 
@@ -728,15 +3624,68 @@ class Record(object):
     1
     >>> record5.b
     'Bir'
+
+    Positional rows, such as tuples read by ``csv.reader``, are mapped by the column indices of the keys in the
+    header:
+
+    >>> record6 = Test3Record(("Iki", 1), header=("b", "a"))
+    >>> (record6.a, record6.b)
+    (1, 'Iki')
+
+    Values are stored in a list indexed by the value slot indices assigned to fields in the order of their
+    sorted names. Records of subclasses have a ``__dict__`` as usual, unless the record class declares
+    ``__slots__``, which saves memory per record:
+
+    >>> record5.x = 1
+    >>> class SlottedRecord(Record):
+    ...     __slots__ = ()
+    ...     a = KeyField()
+    >>> SlottedRecord(dict(a=1)).x = 1
+    Traceback (most recent call last):
+    ...
+    AttributeError: 'SlottedRecord' object has no attribute 'x'
+
+    Attribute access goes through :meth:`getval` if a subclass overrides it:
+
+    >>> class UpperRecord(Record):
+    ...     a = KeyField()
+    ...     def getval(self, name):
+    ...         value = super(UpperRecord, self).getval(name)
+    ...         return Value(value.value.upper(), status=value.status, message=value.message)
+    >>> UpperRecord(dict(a="x")).a
+    'X'
     """
     ## TODO: [Improvement] Rename _fields -> __fields, _values -> __value
 
-    def __init__(self, record):
+    __slots__ = ("_Record__record", "_Record__mappers", "_values", "_trace", "_pinned", "_lookups")
+
+    #: Defines the :class:`LRU` instance to cache the value slots of raw records by their fingerprints with, if any.
+    #: See :meth:`_fingerprinter`.
+    #:
+    #: Fingerprints consist of the raw values for the keys of key fields only. Use the row cache only if the
+    #: functions of fields read nothing else, ie. neither other keys of the raw record nor any external state.
+    #: Otherwise, raw records differing elsewhere share stale value slots.
+    row_cache = None
+
+    def __init__(self, record, header=None):
+        """
+        Constructs a record for the raw record.
+
+        :param record: The raw record.
+        :param header: The header if the raw record is a positional row.
+        """
         ## Save the record slot:
         self.__record = record
 
-        ## Declare the values map:
-        self._values = {}
+        ## Get the mappers, reading by column indices for positional rows:
+        self.__mappers = self._mappers if header is None else self._header_mappers(header)
+
+        ## Declare the values list, the frame of the field being traced, the value slots set explicitly and the
+        ## resolved values prefetched for lookups:
+        self._values = [None] * len(self.__mappers)
+        self._trace = None
+        self._pinned = _NO_INDICES
+        self._lookups = None
 
     def __getattr__(self, item):
         """
@@ -746,7 +3695,17 @@ class Record(object):
         :param item: The name of the attribute, in particular the field name.
         :return: The value (value attribute of the Value).
         """
-        return self.getval(item).value
+        ## This is the hottest path, hence inlined `getval`:
+        index = self._indices.get(item)
+        if index is None:
+            raise AttributeError("Record does not have value slot named '{}'".format(item))
+        trace = self._trace
+        if trace is not None:
+            trace[1].add(index)
+        value = self._values[index]
+        if value is None:
+            value = self._values[index] = self.__mappers[index](self, self.__record)
+        return value.value
 
     def hasval(self, name):
         """
@@ -755,7 +3714,7 @@ class Record(object):
         :param name: The name of the value slot.
         :return: ``True`` if we have a value slot called ``name``, ``False`` otherwise.
         """
-        return name in self._fields
+        return name in self._indices
 
     def getval(self, name):
         """
@@ -764,17 +3723,24 @@ class Record(object):
         :param name: The name of the value slot.
         :return: The value slot, ie. the boxed value instance of class :class:`Value`.
         """
-        ## Did we compute this before?
-        if name in self._values:
-            ## Yes, return the value slot:
-            return self._values.get(name)
-
         ## Do we have such a value slot?
-        if not self.hasval(name):
+        index = self._indices.get(name)
+        if index is None:
             raise AttributeError("Record does not have value slot named '{}'".format(name))
 
-        ## Apparently, we have never computed the value. Let's compute the value slot and return:
-        return self.setval(name, self._fields.get(name).map(self, self.__record))
+        ## If we are tracing the dependencies of a field of this record, record the access:
+        trace = self._trace
+        if trace is not None:
+            trace[1].add(index)
+
+        ## Did we compute this before?
+        value = self._values[index]
+        if value is None:
+            ## Nope, let's compute the value slot and save:
+            value = self._values[index] = self.__mappers[index](self, self.__record)
+
+        ## Done, return the value slot:
+        return value
 
     def setval(self, name, value, status=None, message=None, **kwargs):
         """
@@ -788,24 +3754,30 @@ class Record(object):
         :return: The :class:`Value` instance set.
         """
         ## Do we have such a value slot?
-        if not self.hasval(name):
+        index = self._indices.get(name)
+        if index is None:
             raise AttributeError("Record does not have value slot named '{}'".format(name))
 
         ## Create a value instance:
         if isinstance(value, Value):
-            ## Get a copy of payload if any:
-            payload = copy.deepcopy(value.payload)
-
-            ## Update the payload with kwargs:
-            payload.update(kwargs.copy())
-
-            ## Create the new value:
-            value = Value(value=value.value, status=status or value.status, message=message or value.message, **payload)
+            ## Values are immutable, hence shared unless something is overridden:
+            if status or message or kwargs:
+                ## Get the payload, copied only if it is going to be updated with kwargs:
+                payload = value.payload
+                if kwargs:
+                    payload = copy.deepcopy(payload)
+                    payload.update(kwargs)
+
+                ## Create the new value:
+                value = Value(value=value.value, status=status or value.status, message=message or value.message,
+                              **payload)
         else:
             value = Value(value=value, status=status or Value.Status.Success, message=message, **kwargs)
 
-        ## Save the slot:
-        self._values[name] = value
+        ## Save the slot, pin it and invalidate the value slots depending on it:
+        self._values[index] = value
+        self._pinned = self._pinned | frozenset([index])
+        self._invalidate(index)
 
         ## Done, return the value set:
         return value
@@ -816,16 +3788,62 @@ class Record(object):
 
         :param name: The name of the value.
         """
-        if name in self._values:
-            del self._values[name]
+        index = self._indices.get(name)
+        if index is not None:
+            self._values[index] = None
+            self._pinned = self._pinned - frozenset([index]) or _NO_INDICES
+            self._invalidate(index)
+
+    def _invalidate(self, index):
+        """
+        Invalidates the value slots depending on the value slot, except the ones set explicitly.
+
+        :param index: The value slot index.
+        """
+        values, pinned = self._values, self._pinned
+        for dependent in self._invalidates(index):
+            if dependent not in pinned:
+                values[dependent] = None
 
-    def allvals(self):
+    def allvals(self, fields=None):
         """
         Returns all the value slots.
 
+        :param fields: The names of the value slots to be computed and returned, all if ``None``.
         :return: A dictionary of all computed value slots.
         """
-        return {field: self.getval(field) for field in self._fields}
+        names = self._names if fields is None else fields
+        return dict(zip(names, self._computed(None if fields is None else self._projection(fields))))
+
+    def _computed(self, indices=None):
+        """
+        Computes the value slots which are not computed yet and returns the list of all value slots.
+
+        If :meth:`getval` is overridden, the value slots are returned through it instead.
+
+        :param indices: The indices of the value slots to be computed and returned, all if ``None``.
+        :return: The list of value slots in the order of the sorted field names, or in the order of the indices.
+        """
+        ## Go through `getval` if it is overridden:
+        if self._overrides_getval:
+            names = self._names
+            return [self.getval(names[index]) for index in (range(len(names)) if indices is None else indices)]
+
+        ## Compute the value slots of interest only (and the ones they depend on, as they are accessed):
+        values = self._values
+        if indices is not None:
+            mappers, record = self.__mappers, self.__record
+            for index in indices:
+                if values[index] is None:
+                    values[index] = mappers[index](self, record)
+            return [values[index] for index in indices]
+
+        ## Compute all value slots:
+        if None in values:
+            for index in range(len(values)):
+                if values[index] is None:
+                    values[index] = self.__mappers[index](self, self.__record)
+        return values
 
     def val_none(self, name):
         """
@@ -881,36 +3899,102 @@ class Record(object):
         """
         return self.getval(name).status == Value.Status.Error
 
-    def as_dict(self, detailed=False):
+    def as_dict(self, detailed=False, fields=None):
         """
         Provides a JSON representation of the record instance.
 
         :param detailed: Indicates if we need detailed result, ie. with status and message for each field.
+        :param fields: The names of the fields to be computed and exported in the given order, all if ``None``.
         :return: A JSON representation of the record instance.
+
+        >>> class TestRecord(Record):
+        ...     a = KeyField(cast=as_number)
+        ...     b = KeyField()
+        >>> TestRecord(dict(a="1")).as_dict(detailed=True)
+        OrderedDict([('a', OrderedDict([('value', '1'), ('status', 1), ('message', None)])), \
+('b', OrderedDict([('value', 'None'), ('status', 1), ('message', None)]))])
+
+        Only the requested fields and the fields they depend on are computed:
+
+        >>> class TestRecord(Record):
+        ...     a = KeyField(cast=as_number)
+        ...     b = KeyField(cast=as_number)
+        ...     c = Field(func=lambda i, r: i.a * 2)
+        >>> record = TestRecord(dict(a="1", b="2"))
+        >>> record.as_dict(fields=["c"])
+        OrderedDict([('c', Decimal('2'))])
+        >>> [value is not None for value in record._values]
+        [True, False, True]
+        >>> record.as_dict(fields=["d"])
+        Traceback (most recent call last):
+        ...
+        AttributeError: Record does not have value slot named 'd'
         """
-        ## We have the fields and values saved in the `_fields` and `_values` attributes respectively. We will
-        ## simply iterate over these fields and their respective values.
-        ##
-        ## Let's start with defining the data dictionary:
-        retval = OrderedDict([])
+        ## We have the field names in order, and the value slots computed in the same order. We will simply
+        ## iterate over them:
+        if fields is None:
+            values = zip(self._names, self._computed())
+        else:
+            values = zip(fields, self._computed(self._projection(fields)))
 
-        ## Iterate over fields and get their values:
-        for key in sorted(self._fields):
-            ## Add the field to return value:
-            retval[key] = getattr(self, key, None)
+        ## If not detailed, we need values only:
+        if not detailed:
+            return OrderedDict([(key, value.value) for key, value in values])
 
-            ## If detailed, override with real Value instance:
-            if detailed:
-                ## Get the value:
-                value = self._values.get(key, None)
+        ## Otherwise, add the status and the message for each value:
+        return OrderedDict([(key, OrderedDict([("value", str(value.value)),
+                                               ("status", value.status),
+                                               ("message", value.message)])) for key, value in values])
 
-                ## Add the value:
-                retval[key] = OrderedDict([("value", str(value.value)),
-                                           ("status", value.status),
-                                           ("message", value.message)])
+    def as_tuple(self, fields=None):
+        """
+        Returns the values of the record in the order of the sorted field names.
+
+        :param fields: The names of the fields to be computed and exported in the given order, all if ``None``.
+        :return: A tuple of values.
+
+        >>> class TestRecord(Record):
+        ...     b = KeyField()
+        ...     a = KeyField(cast=as_number)
+        >>> TestRecord(dict(a="1", b="x")).as_tuple()
+        (Decimal('1'), 'x')
+        >>> TestRecord(dict(a="1", b="x")).as_tuple(["b"])
+        ('x',)
+        """
+        return tuple([value.value for value in self._computed(None if fields is None else self._projection(fields))])
 
-        ## Done, return the value:
-        return retval
+    def as_plain_dict(self, fields=None):
+        """
+        Returns the values of the record as a plain dictionary of field names and values, inserted in the order of
+        the sorted field names.
+
+        :param fields: The names of the fields to be computed and exported in the given order, all if ``None``.
+        :return: A dictionary of values.
+
+        >>> class TestRecord(Record):
+        ...     b = KeyField()
+        ...     a = KeyField(cast=as_number)
+        >>> sorted(TestRecord(dict(a="1", b="x")).as_plain_dict().items())
+        [('a', Decimal('1')), ('b', 'x')]
+
+        Values are exported through :meth:`getval` if it is overridden:
+
+        >>> class MaskedRecord(Record):
+        ...     b = KeyField()
+        ...     a = KeyField(cast=as_number)
+        ...     def getval(self, name):
+        ...         value = super(MaskedRecord, self).getval(name)
+        ...         return Value.success("***") if name == "b" else value
+        >>> sorted(MaskedRecord(dict(a="1", b="x")).as_plain_dict().items())
+        [('a', Decimal('1')), ('b', '***')]
+        >>> MaskedRecord(dict(a="1", b="x")).as_tuple(["b"])
+        ('***',)
+        >>> MaskedRecord(dict(a="1", b="x")).as_dict()
+        OrderedDict([('a', Decimal('1')), ('b', '***')])
+        """
+        if fields is None:
+            return dict(zip(self._names, [value.value for value in self._computed()]))
+        return dict(zip(fields, [value.value for value in self._computed(self._projection(fields))]))
 
     @classmethod
     def new(cls, record, **kwargs):
@@ -918,15 +4002,1340 @@ class Record(object):
         Creates a new record from the provided record or dictionary and overriding values from the provided additional
         named arguments.
 
+        A record of the same class is copied on write: The new record shares the raw record and the value slots
+        computed so far, and only the overridden value slots and the value slots depending on them are computed
+        again. Overriding values are mapped as raw values for key fields, against a copy of the raw record with the
+        overriding values, and boxed as successful values for other fields, unless they are :class:`Value`
+        instances already. The new record is constructed as usual, ie. :meth:`__init__` is called on it:
+
+        >>> class TestRecord(Record):
+        ...     a = KeyField(cast=as_number)
+        ...     b = KeyField(cast=as_number)
+        ...     c = Field(func=lambda i, r: i.a + i.b)
+        >>> record = TestRecord(dict(a="1", b="2"))
+        >>> record.c
+        Decimal('3')
+        >>> derived = TestRecord.new(record, b="5")
+        >>> (derived.a, derived.b, derived.c)
+        (Decimal('1'), Decimal('5'), Decimal('6'))
+        >>> derived.getval("a") is record.getval("a")
+        True
+        >>> (record.b, record.c)
+        (Decimal('2'), Decimal('3'))
+
+        Key fields with functions read the other raw values of the raw record:
+
+        >>> class OtherRecord(Record):
+        ...     a = KeyField()
+        ...     b = KeyField(func=lambda i, r, v: "{}-{}".format(r.get("a"), v))
+        >>> OtherRecord.new(OtherRecord(dict(a="x", b="y")), b="z").b
+        'x-z'
+
         :param record: The record or dictionary to be copied from.
         :param kwargs: Named arguments to override.
         :return: New record.
         """
-        ## First of all, get the record as value dictionary:
-        base = copy.deepcopy(record.as_dict() if isinstance(record, Record) else record)
+        ## Get the key fields overridden with raw values:
+        raw = record.__record if type(record) is cls else None
+        keys = [(cls._indices[name], cls._fields[name].key, value) for name, value in kwargs.items()
+                if isinstance(cls._fields.get(name), KeyField) and not isinstance(value, Value)]
+
+        ## Records of other classes, dictionaries and records of positional rows with overridden key fields are
+        ## copied as value dictionaries and mapped again:
+        if type(record) is not cls or (keys and not isinstance(raw, dict)):
+            ## First of all, get the record as value dictionary:
+            base = copy.deepcopy(record.as_dict() if isinstance(record, Record) else record)
+
+            ## Update the dictionary:
+            base.update(kwargs)
+
+            ## Done, create the new record and return:
+            return cls(base)
+
+        ## Copy the raw record with the overriding raw values of key fields, if any:
+        if keys:
+            raw = copy.copy(raw)
+            for _, key, value in keys:
+                raw[key] = value
+
+        ## Create the new record sharing the raw record, the mappers and the value slots (which are immutable):
+        instance = cls(raw)
+        instance.__mappers = record.__mappers
+        instance._values = list(record._values)
+
+        ## Box the overriding values, key fields are mapped again on access:
+        overrides = []
+        for name, value in kwargs.items():
+            index = cls._indices.get(name)
+            if index is None:
+                raise AttributeError("Record does not have value slot named '{}'".format(name))
+            if not isinstance(value, Value):
+                value = None if isinstance(cls._fields[name], KeyField) else Value.success(value)
+            overrides.append((index, value))
+
+        ## Pin the overriding values (unless recomputed from the raw record), invalidate the value slots depending on the overridden ones and then override:
+        pinned = set(record._pinned)
+        for index, value in overrides:
+            if value is None:
+                pinned.discard(index)
+            else:
+                pinned.add(index)
+        instance._pinned = frozenset(pinned) if pinned else _NO_INDICES
+        for index, _ in overrides:
+            instance._invalidate(index)
+        for index, value in overrides:
+            instance._values[index] = value
+
+        ## Done, return the new record:
+        return instance
+
+    @classmethod
+    def dependencies(cls):
+        """
+        Returns the dependencies of fields, either declared or traced on their evaluations so far.
+
+        Fields without declared dependencies are traced on every evaluation and the value slots they access are
+        merged into their dependencies, since they may access other fields on other evaluations. Until a field is
+        traced, it is assumed to depend on all others.
+
+        :return: An ordered dictionary of field names and sorted tuples of the names of fields they depend on, or
+                 ``None`` if not known yet.
+
+        >>> class TestRecord(Record):
+        ...     price = KeyField(cast=as_number)
+        ...     qty = KeyField(cast=as_number)
+        ...     total = Field(func=lambda i, r: i.price * i.qty)
+        ...     label = Field(func=lambda i, r: "{} x {}".format(i.qty, i.price), depends=["price", "qty"])
+        >>> TestRecord.dependencies()
+        OrderedDict([('label', ('price', 'qty')), ('price', ()), ('qty', ()), ('total', None)])
+        >>> record = TestRecord(dict(price="2", qty="3"))
+        >>> (record.total, record.label)
+        (Decimal('6'), '3 x 2')
+        >>> TestRecord.dependencies()["total"]
+        ('price', 'qty')
+
+        Setting a value invalidates the values depending on it, which are recomputed on access:
+
+        >>> _ = record.setval("qty", Decimal("4"))
+        >>> (record.total, record.label)
+        (Decimal('8'), '4 x 2')
+
+        Traced dependencies are merged over evaluations, hence fields accessing others conditionally are invalidated
+        as well:
+
+        >>> class BranchRecord(Record):
+        ...     flag = KeyField(cast=as_boolean)
+        ...     x = KeyField()
+        ...     y = KeyField()
+        ...     z = Field(func=lambda i, r: i.x if i.flag else i.y)
+        >>> BranchRecord(dict(flag="1", x=1, y=2)).z
+        1
+        >>> record = BranchRecord(dict(flag="", x=1, y=2))
+        >>> record.z
+        2
+        >>> _ = record.setval("y", 9)
+        >>> record.z
+        9
+
+        Value slots set explicitly are never invalidated, ie. patched values survive other changes:
+
+        >>> _ = record.setval("z", "patched")
+        >>> _ = record.setval("y", 10)
+        >>> _ = record.setval("x", 11)
+        >>> (record.y, record.z)
+        (10, 'patched')
+
+        Circular dependencies are detected:
+
+        >>> class CircularRecord(Record):
+        ...     a = Field(func=lambda i, r: i.b, depends=["b"])
+        ...     b = Field(func=lambda i, r: i.a, depends=["a"])
+        Traceback (most recent call last):
+        ...
+        ValueError: Circular field dependencies: a -> b -> a
+        >>> class CircularRecord(Record):
+        ...     a = Field(func=lambda i, r: i.b)
+        ...     b = Field(func=lambda i, r: i.a)
+        >>> CircularRecord({}).a
+        Traceback (most recent call last):
+        ...
+        ValueError: Circular field dependencies: a -> b -> a
+        """
+        return OrderedDict((name, None if dependencies is None else tuple(sorted(cls._names[i] for i in dependencies)))
+                           for name, dependencies in zip(cls._names, cls._dependencies))
+
+    @classmethod
+    def _invalidates(cls, index):
+        """
+        Returns the indices of the value slots which depend on the value slot, directly or indirectly. Value slots
+        of fields with dependencies not traced yet are assumed to depend on all others. Value slots of asynchronous fields
+        are never invalidated, since they can not be computed again synchronously (see :meth:`amap`).
+
+        :param index: The value slot index.
+        :return: A tuple of value slot indices.
+        """
+        ## Compute the dependents of all value slots if not done already:
+        if cls._dependents is None:
+            ## Get the direct dependents:
+            direct = [set() for _ in cls._names]
+            for dependent, dependencies in enumerate(cls._dependencies):
+                for dependency in range(len(cls._names)) if dependencies is None else dependencies:
+                    if dependency != dependent:
+                        direct[dependency].add(dependent)
+
+            ## Get the transitive closure:
+            dependents = []
+            for node in range(len(cls._names)):
+                found, stack = set(), list(direct[node])
+                while stack:
+                    dependent = stack.pop()
+                    if dependent not in found:
+                        found.add(dependent)
+                        stack.extend(direct[dependent])
+                found.discard(node)
+                dependents.append(tuple(sorted(found - cls._asynchronous)))
+            cls._dependents = dependents
+
+        ## Done, return:
+        return cls._dependents[index]
+
+    @classmethod
+    def _compile_mappers(cls, positions=None):
+        """
+        Compiles the mappers of the fields in the order of value slots, wrapping the ones without declared
+        dependencies with tracers.
+
+        Mappers are compiled with the profiles of fields if the record class is being profiled (see
+        :class:`Profiler`).
+
+        :param positions: The column indices by keys if raw records are positional rows.
+        :return: A list of mappers.
+        """
+        profiler = cls._profiler
+        mappers = [cls._fields[name].compile(positions, None if profiler is None else profiler[name])
+                   for name in cls._names]
+        for index in cls._traced:
+            mappers[index] = _tracer(cls, index, mappers[index])
+        return mappers
+
+    @classmethod
+    def _recompile(cls):
+        """
+        Compiles the mappers of the fields again, dropping the ones compiled for headers so far. Records created
+        before keep their mappers.
+        """
+        cls._mappers = cls._compile_mappers()
+        cls._headers = {}
+
+    @classmethod
+    def _header_mappers(cls, header):
+        """
+        Returns the mappers compiled for positional rows with the header, compiling them on first use.
+
+        :param header: The sequence of keys in column order. The first column wins for duplicate keys.
+        :return: A list of mappers.
+        """
+        header = tuple(header)
+        mappers = cls._headers.get(header)
+        if mappers is None:
+            mappers = cls._headers[header] = cls._compile_mappers(_header_positions(header))
+        return mappers
+
+    @classmethod
+    @contextlib.contextmanager
+    def _prefetched(cls, chunk, header=None):
+        """
+        Prefetches the resolved values of the fields resolving raw values for the chunk of raw records at once, and
+        releases them on exit.
+
+        The context manager provides the resolved values by fields, to be set as the lookups of the records of the
+        chunk (see :meth:`_evaluate`), or ``None`` if there is nothing to prefetch.
+
+        :param chunk: The list of raw records.
+        :param header: The header if raw records are positional rows.
+        :return: A context manager.
+        """
+        if not cls._prefetchers:
+            yield None
+            return
+        positions = None if header is None else _header_positions(header)
+        lookups = dict((field, field.prefetch(chunk, positions)) for field in cls._prefetchers)
+        try:
+            yield lookups
+        finally:
+            ## Release the resolved values, records evaluated afterwards resolve raw values one at a time:
+            for resolved in lookups.values():
+                resolved.clear()
+
+    @classmethod
+    def _prefetching(cls, records, header=None, chunk_size=1000):
+        """
+        Generates the raw records along with the resolved values prefetched for each chunk of raw records while it
+        is consumed (see :meth:`_prefetched`).
+
+        :param records: An iterable of raw records.
+        :param header: The header if raw records are positional rows.
+        :param chunk_size: The number of raw records to be prefetched at once.
+        :return: A generator of tuples of raw records and lookups.
+        """
+        for chunk in _chunks(records, chunk_size):
+            with cls._prefetched(chunk, header) as lookups:
+                for raw in chunk:
+                    yield raw, lookups
+
+    @classmethod
+    def _projection(cls, fields):
+        """
+        Returns the value slot indices of the fields.
+
+        :param fields: The names of the fields.
+        :return: A tuple of value slot indices.
+        """
+        indices = cls._indices
+        for name in fields:
+            if name not in indices:
+                raise AttributeError("Record does not have value slot named '{}'".format(name))
+        return tuple([indices[name] for name in fields])
+
+    @classmethod
+    def schema_hash(cls):
+        """
+        Returns the hash of the schema of the record class, ie. its fields along with their casts and functions
+        (down to their byte code), and the functions of the record class and its bases.
+
+        :return: A hexadecimal digest.
+
+        >>> class TestRecord(Record):
+        ...     a = KeyField(cast=as_number)
+        >>> class OtherRecord(Record):
+        ...     a = KeyField(cast=as_float)
+        >>> TestRecord.schema_hash() == OtherRecord.schema_hash()
+        False
+        """
+        ## Describe the fields and the functions of the record class and its bases:
+        parts = [_describe(cls._fields[name]) for name in cls._names]
+        for base in cls.__mro__[:-1]:
+            parts.extend("{}={}".format(name, _describe(getattr(attr, "__func__", attr)))
+                         for name, attr in sorted(vars(base).items())
+                         if inspect.isfunction(attr) or isinstance(attr, (classmethod, staticmethod)))
+        return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _fingerprinter(cls, header=None):
+        """
+        Returns the function computing the fingerprints of raw records for the row cache, if the record class has
+        one (see :attr:`row_cache`), compiling it for the header on first use.
+
+        The fingerprint of a raw record is the tuple of the record class and the raw values for the keys of its key
+        fields. Raw records with the same fingerprint share their value slots, hence the row cache must only be used
+        if the values of fields depend on the raw values for these keys only.
+
+        :param header: The header if raw records are positional rows.
+        :return: A function accepting a raw record and returning its fingerprint, or ``None`` if there is no row
+                 cache.
+
+        >>> class TestRecord(Record):
+        ...     row_cache = LRU(100)
+        ...     a = KeyField(cast=as_number)
+        ...     b = KeyField(key="a", cast=as_string)
+        >>> TestRecord._fingerprinter()(dict(a="1", c="2")) == (TestRecord, "1")
+        True
+        >>> [record.a for record in TestRecord.map_many([dict(a="1"), dict(a="2"), dict(a="1")])]
+        [Decimal('1'), Decimal('2'), Decimal('1')]
+        >>> (TestRecord.row_cache.hits, TestRecord.row_cache.misses)
+        (1, 2)
+        """
+        ## Do we have a row cache at all?
+        if cls.row_cache is None:
+            return None
+
+        ## Have we compiled the fingerprinter for the header before?
+        header = None if header is None else tuple(header)
+        fingerprinter = cls._fingerprinters.get(header)
+        if fingerprinter is not None:
+            return fingerprinter
+
+        ## Get the accessors of the distinct keys of key fields in the order of value slots:
+        positions = None if header is None else _header_positions(header)
+        keys, accessors = set(), [lambda raw: cls]
+        for name in cls._names:
+            field = cls._fields[name]
+            if isinstance(field, KeyField) and field.key not in keys:
+                keys.add(field.key)
+                accessors.append(field._accessor(positions))
+
+        ## Compile, save and return the fingerprinter:
+        fingerprinter = cls._fingerprinters[header] = lambda raw: tuple([access(raw) for access in accessors])
+        return fingerprinter
+
+    @classmethod
+    def _evaluate(cls, raw, mappers=None, indices=None, fingerprint=None, lookups=None):
+        """
+        Creates a record instance for the raw record and computes all its value slots.
+
+        :param raw: The raw record.
+        :param mappers: The mappers compiled for a header if the raw record is a positional row.
+        :param indices: The indices of the value slots to be computed (along with their dependencies), all if
+                        ``None``.
+        :param fingerprint: The fingerprinter of raw records if the value slots shall be looked up in and saved to
+                            the row cache (see :meth:`_fingerprinter`).
+        :param lookups: The resolved values prefetched for the chunk of the raw record by fields, if any (see
+                        :meth:`_prefetched`).
+        :return: The record instance.
+        """
+        ## Create the record instance and get its values list:
+        instance = cls(raw)
+        instance._lookups = lookups
+        values = instance._values
+
+        ## Use the mappers of the header, if any:
+        if mappers is None:
+            mappers = instance.__mappers
+        else:
+            instance.__mappers = mappers
+
+        ## Look the value slots up in the row cache, if required (skipping raw records with unhashable values):
+        if fingerprint is not None:
+            key = fingerprint(raw)
+            try:
+                cached = cls.row_cache.get(key)
+            except TypeError:
+                fingerprint = None
+            else:
+                if cached is not None:
+                    values[:] = cached
+                    if None not in cached:
+                        return instance
+
+        ## Compute the value slots in order unless computed already (by some other field, for example):
+        if indices is None:
+            for index, mapper in enumerate(mappers):
+                if values[index] is None:
+                    values[index] = mapper(instance, raw)
+        else:
+            for index in indices:
+                if values[index] is None:
+                    values[index] = mappers[index](instance, raw)
+
+        ## Save the value slots to the row cache, if required:
+        if fingerprint is not None:
+            cls.row_cache.put(key, tuple(values))
+
+        ## Done, return the instance:
+        return instance
+
+    @classmethod
+    def compile(cls, header=None):
+        """
+        Returns the compiled mapper of the record class which maps a raw record to the tuple of its value slots,
+        ie. :class:`Value` instances, in the order of the sorted field names.
+
+        The mapper is built once per record class. It looks the field mappers up on each call, hence it follows
+        their recompilation, for example while the record class is being profiled (see :class:`Profiler`).
+
+        :param header: The header if raw records are positional rows.
+        :return: A function accepting a raw record and returning a tuple of :class:`Value` instances.
+
+        >>> class TestRecord(Record):
+        ...     a = KeyField(cast=as_number)
+        ...     b = Field(func="compute_b")
+        ...     def compute_b(self, record):
+        ...         return self.a * 2
+        >>> map_one = TestRecord.compile()
+        >>> [value.value for value in map_one(dict(a="21"))]
+        [Decimal('21'), Decimal('42')]
+        >>> TestRecord.compile() is map_one
+        True
+        >>> [value.value for value in TestRecord.compile(header=["x", "a"])(("?", "21"))]
+        [Decimal('21'), Decimal('42')]
+        """
+        ## Have we compiled the mapper for this very class before?
+        if header is None and cls._map_one is not None:
+            return cls._map_one
+
+        ## Get the evaluator and the header, if any:
+        evaluate, header = cls._evaluate, None if header is None else tuple(header)
+
+        def map_one(raw):
+            ## Get the current mappers for the header, if any:
+            mappers = None if header is None else cls._headers.get(header) or cls._header_mappers(header)
+
+            ## Evaluate the record, using the row cache if any, and return the value slots:
+            fingerprint = None if cls.row_cache is None else cls._fingerprinter(header)
+            return tuple(evaluate(raw, mappers, None, fingerprint)._values)
+
+        ## Save the mapper (unless compiled for a header) and return:
+        if header is None:
+            cls._map_one = map_one
+        return map_one
+
+    @classmethod
+    def map_many(cls, records, chunk_size=1000, output="record", header=None, fields=None, changed_only=False):
+        """
+        Maps the raw records lazily, one chunk of at most ``chunk_size`` raw records at a time, and yields
+        the results in input order.
+
+        The output is one of:
+
+        * ``"record"``: Record instances with all value slots computed,
+        * ``"dict"``: Dictionaries of field names and values,
+        * ``"tuple"``: Tuples of values in the order of the sorted field names.
+
+        Positional rows are supported with a ``header``, either the sequence of keys in column order or ``True`` to
+        take it from the first row. The keys of key fields are resolved to column indices once.
+
+        Lookup fields (see :class:`LookupField`) resolve the raw values of each chunk at once. If the record class
+        has a row cache (see :attr:`row_cache` for when it can be used), raw records seen before share their value
+        slots. With ``changed_only``, raw records found in the row cache are skipped, ie. only the new or changed
+        ones are mapped and yielded.
+
+        If ``fields`` are given, only these fields and the fields they depend on are computed, and dictionaries and
+        tuples carry the values of these fields only, in the given order. Other value slots of records are computed
+        on access.
+
+        :param records: An iterable of raw records.
+        :param chunk_size: The maximum number of raw records to be consumed and mapped at once.
+        :param output: The type of the results.
+        :param header: The header if raw records are positional rows, ``True`` to read it from the first row.
+        :param fields: The names of the fields to be computed, all if ``None``.
+        :param changed_only: Indicates if raw records found in the row cache shall be skipped.
+        :return: A generator of results.
+
+        >>> class TestRecord(Record):
+        ...     a = KeyField(cast=as_number)
+        ...     b = KeyField(cast=as_factor)
+        >>> rows = (dict(a=str(i), b="x") for i in range(3))
+        >>> list(TestRecord.map_many(rows, chunk_size=2, output="tuple"))
+        [(Decimal('0'), 'X'), (Decimal('1'), 'X'), (Decimal('2'), 'X')]
+        >>> [record.a for record in TestRecord.map_many([dict(a="1"), dict(a="2")])]
+        [Decimal('1'), Decimal('2')]
+        >>> sorted(next(TestRecord.map_many([dict(a="1")], output="dict")).items())
+        [('a', Decimal('1')), ('b', None)]
+        >>> list(TestRecord.map_many([["b", "a"], ["x", "1"], ["y"]], header=True, output="tuple"))
+        [(Decimal('1'), 'X'), (None, 'Y')]
+        >>> list(TestRecord.map_many([dict(a="1", b="x")], output="tuple", fields=["b"]))
+        [('X',)]
+        >>> next(TestRecord.map_many([], output="list"))
+        Traceback (most recent call last):
+        ...
+        ValueError: Unknown output type: 'list'
+        """
+        ## Check the arguments:
+        if output not in ("record", "dict", "tuple"):
+            raise ValueError("Unknown output type: '{}'".format(output))
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be a positive integer.")
+        if changed_only and cls.row_cache is None:
+            raise ValueError("Skipping unchanged raw records requires a row cache.")
+
+        ## Get the evaluator and the value slots of the fields, if any:
+        records, header = _resolve_header(records, header)
+        evaluate = cls._evaluate
+        indices = None if fields is None else cls._projection(fields)
+        fingerprint = cls._fingerprinter(header)
+
+        ## Iterate over chunks and map them:
+        for chunk in _chunks(records, chunk_size):
+            ## Skip the raw records found in the row cache, if required:
+            if changed_only:
+                chunk = [raw for raw in chunk if fingerprint(raw) not in cls.row_cache]
+
+            ## Evaluate records with the current mappers for the header, if any, prefetching the lookups of the chunk:
+            mappers = None if header is None else cls._header_mappers(header)
+            with cls._prefetched(chunk, header) as lookups:
+                instances = [evaluate(raw, mappers, indices, fingerprint, lookups) for raw in chunk]
+
+            ## Yield results as requested:
+            if output == "record":
+                for instance in instances:
+                    yield instance
+            elif output == "dict":
+                for instance in instances:
+                    yield instance.as_plain_dict(fields)
+            else:
+                for instance in instances:
+                    yield instance.as_tuple(fields)
+
+    @classmethod
+    def map_parallel(cls, records, workers=None, chunk_size=1000, output="record", ordered=True, header=None,
+                     fields=None):
+        """
+        Maps the raw records in a pool of worker processes, one chunk of at most ``chunk_size`` raw records per
+        task, and yields the results like :meth:`map_many`.
+
+        The record class is pickled by reference, hence it must be importable by the worker processes. Only the
+        value slots are sent back, dictionaries and records are rebuilt in the calling process. The number of
+        chunks in flight is bounded by twice the number of workers.
+
+        :param records: An iterable of raw records.
+        :param workers: The number of worker processes, defaults to the number of CPUs. ``1`` maps in process.
+        :param chunk_size: The number of raw records to be sent to a worker at once.
+        :param output: The type of the results, see :meth:`map_many`.
+        :param ordered: Indicates if results shall be yielded in input order or as soon as chunks are mapped.
+        :param header: The header if raw records are positional rows, ``True`` to read it from the first row.
+        :param fields: The names of the fields to be computed, all if ``None``, see :meth:`map_many`.
+        :return: A generator of results.
+
+        >>> class TestRecord(Record):
+        ...     a = KeyField(cast=as_number)
+        >>> list(TestRecord.map_parallel([dict(a="1"), dict(a="2")], workers=1, output="tuple"))
+        [(Decimal('1'),), (Decimal('2'),)]
+        """
+        ## Check the arguments:
+        if output not in ("record", "dict", "tuple"):
+            raise ValueError("Unknown output type: '{}'".format(output))
+        if chunk_size < 1:
+            raise ValueError("Chunk size must be a positive integer.")
+
+        ## If we have a single worker, there is nothing to parallelize:
+        if workers == 1:
+            for result in cls.map_many(records, chunk_size=chunk_size, output=output, header=header, fields=fields):
+                yield result
+            return
+
+        ## Get the header, if any, and the fields, if any:
+        records, header = _resolve_header(records, header)
+        header = None if header is None else tuple(header)
+        fields = None if fields is None else tuple(fields)
+        if fields is not None:
+            cls._projection(fields)
+
+        ## Import the executor lazily (Python 2 requires the `futures` backport):
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+        ## Get the field names in order:
+        names = cls._names if fields is None else fields
+
+        ## Define how results are rebuilt from what workers send back:
+        def rebuild(chunk, results):
+            if output == "record":
+                for raw, values in zip(chunk, results):
+                    instance = cls(raw) if header is None else cls(raw, header=header)
+                    instance._values[:] = values
+                    yield instance
+            elif output == "dict":
+                for values in results:
+                    yield dict(zip(names, values))
+            else:
+                for values in results:
+                    yield values
+
+        ## Get the number of workers, the maximum number of chunks in flight and the type of results to be sent back:
+        workers = workers or multiprocessing.cpu_count()
+        window = 2 * workers
+        wire = "values" if output == "record" else "tuple"
+
+        ## Start the pool and keep chunks in flight bounded:
+        with ProcessPoolExecutor(workers) as executor:
+
+            ## Keep pending chunks along with their futures:
+            pending = collections.deque()
+
+            ## Submit chunks, yielding results whenever the window is full:
+            chunks = _chunks(records, chunk_size)
+            while True:
+                ## Fill the window:
+                for chunk in itertools.islice(chunks, window - len(pending)):
+                    pending.append((chunk, executor.submit(_map_chunk, cls, chunk, wire, header, fields)))
+
+                ## Are we done?
+                if not pending:
+                    break
+
+                ## Pick the next completed chunk(s):
+                if ordered:
+                    completed = [pending.popleft()]
+                else:
+                    done = wait([future for _, future in pending], return_when=FIRST_COMPLETED)[0]
+                    completed = [item for item in pending if item[1] in done]
+                    for item in completed:
+                        pending.remove(item)
+
+                ## Yield results:
+                for chunk, future in completed:
+                    for result in rebuild(chunk, future.result()):
+                        yield result
+
+    @classmethod
+    def _async_stages(cls, header=None):
+        """
+        Returns the stages of the asynchronous fields compiled for the header, compiling them on first use.
+
+        :param header: The header if raw records are positional rows.
+        :return: A list of tuples of the value slot index, the starting and finishing functions and the indices of
+                 the asynchronous fields the field is declared to depend on.
+        """
+        ## Have we compiled the stages for the header before?
+        header = None if header is None else tuple(header)
+        stages = cls._astages.get(header)
+        if stages is not None:
+            return stages
+
+        ## Compile the stages of the asynchronous fields:
+        positions = None if header is None else _header_positions(header)
+        compiled = [(index, cls._fields[name].acompile(positions)) for index, name in enumerate(cls._names)]
+        compiled = [(index, stage) for index, stage in compiled if stage is not None]
+
+        ## Get the asynchronous fields they depend on:
+        asynchronous = set(index for index, _ in compiled)
+        stages = cls._astages[header] = [
+            (index, start, finish, frozenset(cls._indices[name] for name in cls._fields[cls._names[index]].depends or ()
+                                             if cls._indices[name] in asynchronous))
+            for index, (start, finish) in compiled]
+
+        ## Done, return the stages:
+        return stages
+
+    @classmethod
+    def amap(cls, raw, header=None):
+        """
+        Maps the raw record in the running event loop and returns a future of the record with all its value slots
+        computed.
+
+        Fields with asynchronous functions (coroutine functions) are started at once and awaited concurrently, except
+        for the ones declaring dependencies on other asynchronous fields, which are started after them. Asynchronous
+        functions may access synchronous fields, which are computed on access, and other fields after all
+        asynchronous fields are done.
+
+        The value slots of asynchronous fields can not be computed again synchronously, hence they are not
+        invalidated by :meth:`setval` or :meth:`new`. Map the raw record again to compute them again.
+
+        :param raw: The raw record.
+        :param header: The header if the raw record is a positional row.
+        :return: An awaitable future of the record.
+
+        >>> import asyncio
+        >>> async def double(instance, record):
+        ...     await asyncio.sleep(0)
+        ...     return instance.a * 2
+        >>> class TestRecord(Record):
+        ...     a = KeyField(cast=as_number)
+        ...     b = Field(func=double)
+        ...     c = Field(func=lambda i, r: i.b + 1)
+        >>> async def main():
+        ...     record = await TestRecord.amap(dict(a="20"))
+        ...     return record.c, [record.b async for record in TestRecord.amap_many([dict(a="1"), dict(a="2")])]
+        >>> loop = asyncio.new_event_loop()
+        >>> loop.run_until_complete(main())
+        (Decimal('41'), [Decimal('2'), Decimal('4')])
+        >>> async def patched():
+        ...     record = await TestRecord.amap(dict(a="20"))
+        ...     _ = record.setval("a", Decimal("1"))
+        ...     return record
+        >>> record = loop.run_until_complete(patched())
+        >>> (record.b, record.c, TestRecord.new(record, a="2").b)
+        (Decimal('40'), Decimal('41'), Decimal('40'))
+        >>> TestRecord(dict(a="1")).b
+        Traceback (most recent call last):
+        ...
+        TypeError: Field 'b' has an asynchronous function, map records with Record.amap.
+        >>> loop.close()
+        """
+        return cls._amap(raw, header)[0]
+
+    @classmethod
+    def _amap(cls, raw, header=None):
+        """
+        Maps the raw record in the running event loop (see :meth:`amap`).
+
+        :param raw: The raw record.
+        :param header: The header if the raw record is a positional row.
+        :return: A tuple of the future of the record and the dictionary of the futures of the asynchronous fields
+                 running by value slot index.
+        """
+        import asyncio
+
+        ## Create the future of the record and the record:
+        result = _event_loop().create_future()
+        instance = cls(raw) if header is None else cls(raw, header=header)
+        values = instance._values
+
+        ## Keep the stages of the asynchronous fields waiting for others and the ones running:
+        waiting = dict((index, (start, finish, set(waits))) for index, start, finish, waits in cls._async_stages(header))
+        running = {}
+
+        def fail(error):
+            if not result.done():
+                result.set_exception(error)
+            for future in list(running.values()):
+                future.cancel()
+
+        def launch():
+            ## Start the asynchronous fields which are not waiting for others:
+            for index in [index for index, (_, _, waits) in waiting.items() if not waits]:
+                start, finish, _ = waiting.pop(index)
+                try:
+                    running[index] = asyncio.ensure_future(start(instance, raw))
+                except Exception as error:
+                    return fail(error)
+                running[index].add_done_callback(partial(land, index, finish))
+
+            ## If all asynchronous fields are done, compute the other value slots and complete:
+            if not waiting and not running and not result.done():
+                try:
+                    instance._computed()
+                except Exception as error:
+                    return fail(error)
+                result.set_result(instance)
+
+        def land(index, finish, future):
+            ## Skip if the record is not of interest anymore:
+            running.pop(index, None)
+            if result.done():
+                return
+
+            ## Finish the value slot:
+            try:
+                values[index] = finish(future.result())
+            except BaseException as error:
+                return fail(error)
+
+            ## Release the ones waiting for this one and launch:
+            for _, _, waits in waiting.values():
+                waits.discard(index)
+            launch()
+
+        ## Cancel running fields if the record is cancelled, start and return the future:
+        result.add_done_callback(lambda future: future.cancelled() and fail(asyncio.CancelledError()))
+        launch()
+        return result, running
+
+    @classmethod
+    def amap_many(cls, records, concurrency=64, header=None):
+        """
+        Maps the raw records in the running event loop and returns an asynchronous iterator of records in input
+        order (see :meth:`amap`).
+
+        Raw records are pulled from the source, either an iterable or an asynchronous iterable, only while fewer than
+        ``concurrency`` records are being mapped or waiting to be consumed. Consumers stopping early shall close the
+        iterator to cancel the records being mapped:
+
+        >>> import asyncio
+        >>> async def slow(instance, record):
+        ...     await asyncio.sleep(0.01 * int(record["a"]))
+        ...     return instance.a
+        >>> class TestRecord(Record):
+        ...     a = KeyField(cast=as_number)
+        ...     b = Field(func=slow)
+        >>> async def main():
+        ...     async with TestRecord.amap_many([dict(a=str(i)) for i in range(10)], concurrency=4) as records:
+        ...         async for record in records:
+        ...             break
+        ...     return record.b, len(asyncio.all_tasks()) == 1
+        >>> loop = asyncio.new_event_loop()
+        >>> loop.run_until_complete(main())
+        (Decimal('0'), True)
+        >>> loop.close()
+
+        :param records: An iterable or an asynchronous iterable of raw records.
+        :param concurrency: The maximum number of records in flight.
+        :param header: The header if raw records are positional rows, ``True`` to read it from the first row.
+        :return: An asynchronous iterator of records, which is an asynchronous context manager closing it on exit.
+        """
+        if concurrency < 1:
+            raise ValueError("Concurrency must be a positive integer.")
+        return _AsyncMapping(cls, records, concurrency, header)
+
+    @classmethod
+    def to_columns(cls, records, numpy=False, header=None):
+        """
+        Maps the raw records into a columnar :class:`RecordBatch`.
+
+        :param records: An iterable of raw records.
+        :param numpy: Indicates if numeric, date and date/time columns shall be converted to NumPy arrays.
+        :param header: The header if raw records are positional rows, ``True`` to read it from the first row.
+        :return: A :class:`RecordBatch` instance.
+
+        If NumPy arrays are requested, the fields which can be mapped column-wise (see
+        :meth:`KeyField.compile_column`) are mapped with the vectorized versions of their casts. Factor columns then
+        hold codes into :attr:`RecordBatch.categories`. As missing values are filled in NumPy arrays, the null and
+        blank values of the columns converted are marked in :attr:`RecordBatch.nulls` and :attr:`RecordBatch.blanks`.
+
+        >>> class TestRecord(Record):
+        ...     a = KeyField(cast=as_number)
+        ...     b = KeyField(null=False)
+        >>> batch = TestRecord.to_columns([dict(a="1", b="x"), dict(a="2")])
+        >>> len(batch)
+        2
+        >>> batch["a"]
+        [Decimal('1'), Decimal('2')]
+        >>> list(batch.statuses["b"]) == [Value.Status.Success, Value.Status.Error]
+        True
+        >>> batch.messages
+        [(1, 'b', 'Value is not allowed to be None.')]
+        """
+        ## Get the field names in order and their positions, ie. value slot indices:
+        names, positions = cls._names, cls._indices
+
+        ## Get the header and the mappers, if any:
+        records, header = _resolve_header(records, header)
+        mappers = cls._mappers if header is None else cls._header_mappers(header)
+        columns_of = None if header is None else _header_positions(header)
+
+        ## Get the column mappers of the fields which can be mapped column-wise, if NumPy arrays are requested:
+        column_mappers = {}
+        if numpy:
+            column_mappers = dict((name, field.compile_column(columns_of)) for name, field in cls._fields.items())
+            column_mappers = dict((name, mapper) for name, mapper in column_mappers.items() if mapper is not None)
+
+        ## Column-wise mapping requires the records at hand:
+        if column_mappers:
+            records = list(records)
+
+        ## Get the mappers of the fields to be mapped record by record:
+        scalars = tuple((index, name, mappers[index]) for index, name in enumerate(names) if name not in column_mappers)
+
+        ## Prepare columns, statuses, messages, categories and masks of missing values:
+        columns = [[] for _ in names]
+        statuses = [array.array("B") for _ in names]
+        messages = []
+        categories = {}
+        nulls, blanks = {}, {}
+
+        ## Prefetch the lookups for chunks of records, if any:
+        rows = cls._prefetching(records, header) if cls._prefetchers else ((raw, None) for raw in records)
+
+        ## Iterate over records and fill the columns record by record:
+        size = 0
+        for size, (raw, lookups) in enumerate(rows, 1):
+            instance = cls(raw)
+            instance.__mappers = mappers
+            instance._lookups = lookups
+            values = instance._values
+            for position, name, mapper in scalars:
+                value = values[position]
+                if value is None:
+                    value = values[position] = mapper(instance, raw)
+                columns[position].append(value.value)
+                statuses[position].append(value.status)
+                if value.message is not None:
+                    messages.append((size - 1, name, value.message))
+
+        ## Fill the columns which can be mapped column-wise:
+        for name, mapper in column_mappers.items():
+            column, status, column_messages = mapper(records)
+            columns[positions[name]], statuses[positions[name]] = column.data, status
+            messages.extend((index, name, message) for index, message in column_messages)
+            nulls[name], blanks[name] = column.null, column.blank
+            if column.categories is not None:
+                categories[name] = column.categories
+
+        ## Keep messages in the order of records and fields:
+        if column_mappers:
+            messages.sort(key=lambda message: (message[0], positions[message[1]]))
+
+        ## Convert the rest to NumPy arrays if required, keeping the masks of missing values of the ones converted:
+        if numpy:
+            for position, name in enumerate(names):
+                column = columns[position]
+                if isinstance(column, list):
+                    columns[position] = _as_ndarray(column)
+                    if columns[position] is not column:
+                        nulls[name], blanks[name] = _column_masks(column)
+
+        ## Done, return the batch:
+        return RecordBatch(names, columns, statuses, messages, size, categories, nulls, blanks)
+
+
+class RecordBatch(object):
+    """
+    Provides a columnar representation of a batch of mapped records.
+
+    Each field has a column of values and a column of statuses. Messages are kept sparse as a list of
+    ``(row index, field name, message)`` tuples.
+
+    >>> batch = RecordBatch(("a",), ([1, 2],), (array.array("B", [1, 3]),), [(1, "a", "Oops.")], 2)
+    >>> batch.fields
+    ('a',)
+    >>> batch["a"]
+    [1, 2]
+    >>> batch.errors("a")
+    [1]
+    """
+
+    def __init__(self, fields, columns, statuses, messages, size, categories=None, nulls=None, blanks=None):
+        """
+        Constructs a record batch.
+
+        :param fields: The field names in order.
+        :param columns: The columns of values in the order of field names.
+        :param statuses: The columns of statuses in the order of field names.
+        :param messages: The list of ``(row index, field name, message)`` tuples.
+        :param size: The number of records in the batch.
+        :param categories: The categories of the factor columns holding codes, by field names.
+        :param nulls: The boolean NumPy arrays marking null values of the NumPy columns, by field names.
+        :param blanks: The boolean NumPy arrays marking blank values of the NumPy columns, by field names.
+        """
+        self.__fields = tuple(fields)
+        self.__columns = OrderedDict(zip(self.__fields, columns))
+        self.__statuses = OrderedDict(zip(self.__fields, statuses))
+        self.__messages = messages
+        self.__size = size
+        self.__categories = categories or {}
+        self.__nulls = nulls or {}
+        self.__blanks = blanks or {}
+
+    @property
+    def fields(self):
+        """
+        Returns the field names in order.
+        """
+        return self.__fields
+
+    @property
+    def columns(self):
+        """
+        Returns the columns of values by field names.
+        """
+        return self.__columns
+
+    @property
+    def statuses(self):
+        """
+        Returns the columns of statuses by field names.
+        """
+        return self.__statuses
+
+    @property
+    def messages(self):
+        """
+        Returns the list of ``(row index, field name, message)`` tuples.
+        """
+        return self.__messages
+
+    @property
+    def categories(self):
+        """
+        Returns the categories of the factor columns holding codes, by field names.
+        """
+        return self.__categories
+
+    @property
+    def nulls(self):
+        """
+        Returns the boolean NumPy arrays marking null values of the NumPy columns, by field names.
+        """
+        return self.__nulls
+
+    @property
+    def blanks(self):
+        """
+        Returns the boolean NumPy arrays marking blank values of the NumPy columns, by field names.
+        """
+        return self.__blanks
+
+    def __len__(self):
+        return self.__size
+
+    def __getitem__(self, name):
+        """
+        Returns the column of values for the field.
+
+        :param name: The name of the field.
+        :return: The column of values.
+        """
+        return self.__columns[name]
+
+    def errors(self, name):
+        """
+        Returns the indices of the rows for which the value of the field is an error.
+
+        :param name: The name of the field.
+        :return: A list of row indices.
+        """
+        return [index for index, status in enumerate(self.__statuses[name]) if status == Value.Status.Error]
+
+
+def _as_ndarray(column):
+    """
+    Converts a column of numeric, date or date/time values to a NumPy array if possible. ``None`` and blank values
+    become ``NaN`` or ``NaT``. Other columns are returned as they are.
+
+    :param column: A list of values.
+    :return: A NumPy array or the column itself.
+    """
+    ## Import NumPy lazily as it is an optional dependency:
+    import numpy
+
+    ## Get the types of values which are not missing:
+    kinds = set(type(value) for value in column if value is not None and value != "")
+    missing = any(value is None or value == "" for value in column)
+
+    ## Decide on the array type:
+    if not kinds:
+        return column
+    elif kinds <= set([int]) and not missing:
+        return numpy.array(column, dtype="int64")
+    elif kinds <= set([int, float, Decimal]):
+        return numpy.array([numpy.nan if value is None or value == "" else float(value) for value in column])
+    elif kinds <= set([bool]) and not missing:
+        return numpy.array(column, dtype="bool")
+    elif kinds <= set([datetime.date]):
+        return numpy.array([None if value == "" else value for value in column], dtype="datetime64[D]")
+    elif kinds <= set([datetime.datetime]):
+        return numpy.array([None if value == "" else value for value in column], dtype="datetime64[us]")
+    return column
+
+
+@contextlib.contextmanager
+def _open_lines(source, encoding, buffer_size, mapped):
+    """
+    Opens the source for reading text lines.
+
+    :param source: A path or a file-like object of text lines.
+    :param encoding: The encoding of the file.
+    :param buffer_size: The size of the read buffer in bytes.
+    :param mapped: Indicates if the file shall be memory-mapped.
+    :return: A context manager for an iterable of text lines.
+    """
+    ## File-like objects are read as they are, and not closed:
+    if hasattr(source, "read"):
+        yield source
+        return
+
+    ## Memory-mapped files are read line by line from the mapping:
+    if mapped:
+        with io.open(source, "rb") as stream:
+            ## Empty files can not be mapped:
+            if not stream.seek(0, io.SEEK_END):
+                yield iter(())
+                return
+            mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                yield (line.decode(encoding) for line in iter(mapping.readline, b""))
+            finally:
+                mapping.close()
+        return
+
+    ## Otherwise, open with a large buffer:
+    with io.open(source, "r", encoding=encoding, newline="", buffering=buffer_size) as stream:
+        yield stream
+
+
+def read_csv(source, record_cls, output="record", header=True, chunk_size=1000, encoding="utf-8",
+             buffer_size=1 << 20, mapped=False, **fmtparams):
+    """
+    Reads the CSV file and yields its rows mapped by the record class, see :meth:`Record.map_many`.
+
+    Rows are read by ``csv.reader`` as positional rows and mapped by the column indices of the keys in the header,
+    hence no dictionary is built per row. Memory is bounded by the chunk size.
+
+    :param source: A path or a file-like object (which is not closed) of text.
+    :param record_cls: The record class.
+    :param output: The type of the results.
+    :param header: The header, ``True`` to read it from the first row.
+    :param chunk_size: The maximum number of rows to be consumed and mapped at once.
+    :param encoding: The encoding of the file.
+    :param buffer_size: The size of the read buffer in bytes.
+    :param mapped: Indicates if the file shall be memory-mapped rather than read through a buffer.
+    :param fmtparams: Formatting parameters for ``csv.reader``.
+    :return: A generator of results.
+
+    >>> class TestRecord(Record):
+    ...     a = KeyField(cast=as_number)
+    ...     b = KeyField(cast=as_factor)
+    >>> list(read_csv(io.StringIO(u"b,a\\nx,1\\ny,2\\n"), TestRecord, output="tuple"))
+    [(Decimal('1'), 'X'), (Decimal('2'), 'Y')]
+    >>> list(read_csv(io.StringIO(u"x;1\\n"), TestRecord, output="tuple", header=["b", "a"], delimiter=";"))
+    [(Decimal('1'), 'X')]
+    """
+    with _open_lines(source, encoding, buffer_size, mapped) as lines:
+        rows = csv.reader(lines, **fmtparams)
+        for result in record_cls.map_many(rows, chunk_size=chunk_size, output=output, header=header):
+            yield result
+
+
+def _jsonl_rows(lines, chunk_size):
+    """
+    Parses the JSON Lines one chunk at a time, skipping blank lines.
+
+    Each line is decoded with :meth:`json.JSONDecoder.raw_decode`, which skips the whitespace handling of
+    ``json.loads``, and rejected unless the value decoded spans the whole line.
+
+    :param lines: An iterable of text lines.
+    :param chunk_size: The maximum number of lines to be parsed at once.
+    :return: A generator of parsed values.
+
+    >>> list(_jsonl_rows(['{"a": 1}\\n', '\\n', '[2]\\n'], 10))
+    [{'a': 1}, [2]]
+    >>> list(_jsonl_rows(['1, 2\\n'], 10))
+    Traceback (most recent call last):
+    ...
+    ValueError: Invalid JSON on line 1: 1, 2
+    >>> list(_jsonl_rows(['1, 2\\n', '[3\\n', '4]\\n'], 10))
+    Traceback (most recent call last):
+    ...
+    ValueError: Invalid JSON on line 1: 1, 2
+    """
+    decode = json.JSONDecoder().raw_decode
+    number = 0
+    for chunk in _chunks(lines, chunk_size):
+        ## Decode the non-blank lines, making sure that each line is exactly one value:
+        rows = []
+        for index, line in enumerate(chunk, number + 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row, end = decode(line)
+            except ValueError:
+                end = None
+            if end != len(line):
+                raise ValueError("Invalid JSON on line {}: {}".format(index, line))
+            rows.append(row)
+        number += len(chunk)
+
+        ## Yield rows:
+        for row in rows:
+            yield row
+
+
+def read_jsonl(source, record_cls, output="record", chunk_size=1000, encoding="utf-8", buffer_size=1 << 20,
+               mapped=False):
+    """
+    Reads the JSON Lines file and yields its values mapped by the record class, see :meth:`Record.map_many`.
+
+    Lines are parsed a chunk at a time, blank lines are skipped. Memory is bounded by the chunk size.
+
+    :param source: A path or a file-like object (which is not closed) of text.
+    :param record_cls: The record class.
+    :param output: The type of the results.
+    :param chunk_size: The maximum number of lines to be parsed and mapped at once.
+    :param encoding: The encoding of the file.
+    :param buffer_size: The size of the read buffer in bytes.
+    :param mapped: Indicates if the file shall be memory-mapped rather than read through a buffer.
+    :return: A generator of results.
+
+    >>> class TestRecord(Record):
+    ...     a = KeyField(cast=as_number)
+    >>> list(read_jsonl(io.StringIO(u'{"a": "1"}\\n{"a": 2}\\n'), TestRecord, output="tuple"))
+    [(Decimal('1'),), (Decimal('2'),)]
+    """
+    with _open_lines(source, encoding, buffer_size, mapped) as lines:
+        rows = _jsonl_rows(lines, chunk_size)
+        for result in record_cls.map_many(rows, chunk_size=chunk_size, output=output):
+            yield result
+
+
+@contextlib.contextmanager
+def _open_target(target, encoding, buffer_size):
+    """
+    Opens the target for writing text.
+
+    :param target: A path or a file-like object of text.
+    :param encoding: The encoding of the file.
+    :param buffer_size: The size of the write buffer in bytes.
+    :return: A context manager for a file-like object.
+    """
+    ## File-like objects are written as they are, and not closed:
+    if hasattr(target, "write"):
+        yield target
+        return
+
+    ## Otherwise, open with a large buffer:
+    with io.open(target, "w", encoding=encoding, newline="", buffering=buffer_size) as stream:
+        yield stream
 
-        ## Update the dictionary:
-        base.update(kwargs)
 
-        ## Done, create the new record and return:
-        return cls(base)
+def write_jsonl(records, target, detailed=False, chunk_size=1000, encoding="utf-8", buffer_size=1 << 20, default=str):
+    """
+    Writes the records as JSON Lines, one object of field names and values per record in the order of the sorted
+    field names.
+
+    Values are read from the value slots of records, computing the ones which are not computed yet. If detailed, each
+    field is an object of its value, status and message as in ``as_dict(detailed=True)``, values being encoded as
+    they are rather than as strings. Lines are written one chunk at a time.
+
+    :param records: An iterable of records.
+    :param target: A path or a file-like object (which is not closed) of text.
+    :param detailed: Indicates if status and message shall be written for each field.
+    :param chunk_size: The maximum number of lines to be written at once.
+    :param encoding: The encoding of the file.
+    :param buffer_size: The size of the write buffer in bytes.
+    :param default: The function to encode values which are not JSON serializable, such as dates and decimals.
+    :return: The number of records written.
+
+    >>> class TestRecord(Record):
+    ...     a = KeyField(cast=as_number)
+    ...     b = KeyField(null=False)
+    >>> stream = io.StringIO()
+    >>> write_jsonl(TestRecord.map_many([dict(a="1", b="x")]), stream)
+    1
+    >>> print(stream.getvalue().strip())
+    {"a": "1", "b": "x"}
+    >>> stream = io.StringIO()
+    >>> write_jsonl(TestRecord.map_many([dict(a="1")]), stream, detailed=True)
+    1
+    >>> print(stream.getvalue().strip())
+    {"a": {"value": "1", "status": 1, "message": null}, "b": {"value": null, "status": 3, \
+"message": "Value is not allowed to be None."}}
+    """
+    ## Get the encoder once:
+    encode = json.JSONEncoder(default=default).encode
+
+    count = 0
+    with _open_target(target, encoding, buffer_size) as stream:
+        for chunk in _chunks(records, chunk_size):
+            lines = []
+            for record in chunk:
+                values = record._computed()
+                if detailed:
+                    data = dict((name, {"value": value.value, "status": value.status, "message": value.message})
+                                for name, value in zip(record._names, values))
+                else:
+                    data = dict(zip(record._names, [value.value for value in values]))
+                lines.append(encode(data))
+            lines.append("")
+            stream.write("\n".join(lines))
+            count += len(chunk)
+    return count
+
+
+def write_csv(records, target, detailed=False, header=True, chunk_size=1000, encoding="utf-8", buffer_size=1 << 20,
+              **fmtparams):
+    """
+    Writes the records as CSV, one row of values per record in the order of the sorted field names.
+
+    Values are read from the value slots of records, computing the ones which are not computed yet. ``None`` is
+    written as an empty string. If detailed, each field is followed by its ``<name>.status`` and ``<name>.message``
+    columns. Rows are written one chunk at a time.
+
+    :param records: An iterable of records of the same record class.
+    :param target: A path or a file-like object (which is not closed) of text.
+    :param detailed: Indicates if status and message columns shall be written for each field.
+    :param header: Indicates if the header row shall be written.
+    :param chunk_size: The maximum number of rows to be written at once.
+    :param encoding: The encoding of the file.
+    :param buffer_size: The size of the write buffer in bytes.
+    :param fmtparams: Formatting parameters for ``csv.writer``.
+    :return: The number of records written.
+
+    >>> class TestRecord(Record):
+    ...     a = KeyField(cast=as_number)
+    ...     b = KeyField(null=False)
+    >>> stream = io.StringIO()
+    >>> write_csv(TestRecord.map_many([dict(a="1", b="x"), dict(a="2")]), stream, detailed=True, lineterminator="\\n")
+    2
+    >>> print(stream.getvalue().strip())
+    a,a.status,a.message,b,b.status,b.message
+    1,1,,x,1,
+    2,1,,,3,Value is not allowed to be None.
+    """
+    count = 0
+    with _open_target(target, encoding, buffer_size) as stream:
+        writer = csv.writer(stream, **fmtparams)
+        for chunk in _chunks(records, chunk_size):
+            ## Write the header for the first chunk, if required:
+            if header and not count:
+                names = chunk[0]._names
+                writer.writerow([column for name in names for column in (name, name + ".status", name + ".message")]
+                                if detailed else names)
+
+            ## Write the rows:
+            if detailed:
+                writer.writerows([column for value in record._computed()
+                                  for column in (value.value, value.status, value.message)] for record in chunk)
+            else:
+                writer.writerows([value.value for value in record._computed()] for record in chunk)
+            count += len(chunk)
+    return count
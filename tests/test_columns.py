@@ -0,0 +1,134 @@
+"""
+Tests the vectorized casts against their scalar versions. Skipped if NumPy is not installed.
+
+Run from the repository root::
+
+    python -m unittest discover tests
+"""
+
+import datetime
+import os
+import sys
+import unittest
+
+## Make sure that we test the working copy:
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from normalazy import (KeyField, Record, as_boolean, as_boolean_column, as_date, as_date_column,  # noqa: E402
+                       as_datetime, as_datetime_column, as_factor, as_factor_column, as_integer, as_integer_column,
+                       as_number, as_number_column, as_string, as_string_column)
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed.")
+class TestColumns(unittest.TestCase):
+    """
+    Checks that vectorized casts agree with their scalar versions value by value, along with their masks.
+    """
+
+    def assertMasks(self, column, values):
+        self.assertEqual(column.null.tolist(), [value is None for value in values])
+        self.assertEqual(column.blank.tolist(), [value == "" for value in values])
+
+    def assertAgrees(self, column, values, cast, convert=lambda value: value):
+        self.assertMasks(column, values)
+        self.assertEqual(len(column.data), len(values))
+        for index, value in enumerate(values):
+            if value is not None and value != "":
+                self.assertEqual(column.data[index], convert(cast(value)), "Mismatch for {!r}".format(value))
+
+    def test_string(self):
+        values = ["a", " b ", None, "", "  ", "c\x00", "\tstraße\n", 12]
+        column = as_string_column(values)
+        self.assertAgrees(column, values, as_string)
+        self.assertEqual(column.data[2], "")
+
+    def test_factor(self):
+        values = ["straße", " a ", None, "", "A", "ǆ", "b", None]
+        column = as_factor_column(values)
+        self.assertMasks(column, values)
+        for index, value in enumerate(values):
+            if value is None:
+                self.assertEqual(column.data[index], -1)
+            else:
+                self.assertEqual(column.categories[column.data[index]], as_factor(value))
+        self.assertEqual(list(column.categories), sorted(set(as_factor(value) for value in values if value is not None)))
+
+    def test_factor_nulls(self):
+        column = as_factor_column([None, None])
+        self.assertEqual(column.data.tolist(), [-1, -1])
+        self.assertEqual(len(column.categories), 0)
+
+    def test_number(self):
+        values = ["1", " 2.5 ", None, "", "-1e3", "0.1"]
+        column = as_number_column(values)
+        self.assertAgrees(column, values, as_number, float)
+        self.assertTrue(numpy.isnan(column.data[2]) and numpy.isnan(column.data[3]))
+
+    def test_number_scaled(self):
+        values = ["1.23", None, "-0.5", ""]
+        column = as_number_column(values, scale=2)
+        self.assertAgrees(column, values, as_number, lambda value: int(value * 100))
+
+    def test_integer(self):
+        values = ["1", " 2 ", None, "", "12.0", "-7"]
+        column = as_integer_column(values)
+        self.assertEqual(column.data.dtype, numpy.dtype("int64"))
+        self.assertAgrees(column, values, as_integer)
+
+    def test_integer_overflow(self):
+        for values in (["1", "99999999999999999999", None], ["1.0", "1e20", ""]):
+            column = as_integer_column(values)
+            self.assertEqual(column.data.dtype, numpy.dtype("object"))
+            self.assertAgrees(column, values, as_integer)
+
+    def test_integer_fractional(self):
+        with self.assertRaises(ValueError):
+            as_integer_column(["1", "12.5"])
+        with self.assertRaises(ValueError):
+            as_integer("12.5")
+
+    def test_boolean(self):
+        values = ["1", "", None, "yes", "0", "False"]
+        column = as_boolean_column(values)
+        self.assertAgrees(column, values, as_boolean, bool)
+
+    def test_datetime(self):
+        values = ["2015-01-01 10:11:12", None, "", "2015-1-01 10:11:12", "2020-02-29 00:00:00"]
+        column = as_datetime_column(values)
+        self.assertAgrees(column, values, as_datetime, lambda value: numpy.datetime64(value, "us"))
+        self.assertTrue(numpy.isnat(column.data[1]) and numpy.isnat(column.data[2]))
+
+    def test_date(self):
+        values = ["2015-01-01", None, "", "2015-1-01", "2016-02-29"]
+        column = as_date_column(values)
+        self.assertAgrees(column, values, as_date, lambda value: numpy.datetime64(value, "D"))
+
+    def test_date_format(self):
+        values = ["01/02/2015", None, ""]
+        column = as_date_column(values, "%d/%m/%Y")
+        self.assertAgrees(column, values, lambda value: as_date(value, "%d/%m/%Y"),
+                          lambda value: numpy.datetime64(value, "D"))
+        self.assertEqual(column.data[0], numpy.datetime64(datetime.date(2015, 2, 1), "D"))
+
+    def test_batch_masks(self):
+        class TestRecord(Record):
+            a = KeyField(cast=as_number)
+            b = KeyField(cast=as_factor)
+            c = KeyField(func=lambda instance, record, value: value)
+
+        batch = TestRecord.to_columns([dict(a="1", b="x", c="1"), dict(a=None, b="", c=""), dict(a="", b=None)],
+                                      numpy=True)
+        self.assertEqual(batch.nulls["a"].tolist(), [False, True, False])
+        self.assertEqual(batch.blanks["a"].tolist(), [False, False, True])
+        self.assertEqual(batch.nulls["b"].tolist(), [False, False, True])
+        self.assertEqual(batch.blanks["b"].tolist(), [False, True, False])
+        self.assertEqual(batch["b"].tolist(), [1, 0, -1])
+
+
+if __name__ == "__main__":
+    unittest.main()